@@ -0,0 +1,274 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from uno_engine import BLACK, CARDS, DECK_SIZE, DRAW2, REVERSE, SKIP, WILD4
+from uno_engine.headless import MAX_TURNS, SimStats, format_report, new_bot_game
+
+# CARD ENCODING
+# Same ids as the interned CARDS table
+CARD_COLOR = np.array([c.color_id for c in CARDS], np.int8)
+CARD_VALUE = np.array([c.value_id for c in CARDS], np.int8)
+MAX_HAND = DECK_SIZE
+HAND_SIZE = 7
+
+# BATCH ENGINE
+class BatchEngine:
+    def __init__(self, n_games, seats=3, seed=None):
+        self.n = n_games
+        self.seats = seats
+        self.rng = np.random.default_rng(seed)
+        self.py_rngs = None
+        self.deck = np.zeros((n_games, DECK_SIZE), np.int16)
+        self.deck_len = np.zeros(n_games, np.int16)
+        self.discard = np.zeros((n_games, DECK_SIZE), np.int16)
+        self.discard_len = np.zeros(n_games, np.int16)
+        self.hands = np.zeros((n_games, seats, MAX_HAND), np.int16)
+        self.hand_len = np.zeros((n_games, seats), np.int16)
+        self.color = np.zeros(n_games, np.int8)
+        self.direction = np.ones(n_games, np.int8)
+        self.seat = np.zeros(n_games, np.int8)
+        self.turns = np.zeros(n_games, np.int32)
+        self.active = np.ones(n_games, bool)
+        self.winner = np.full(n_games, -1, np.int8)
+
+    def deal(self):
+        all_games = np.arange(self.n)
+        self.deck[:] = np.argsort(self.rng.random((self.n, DECK_SIZE)), axis=1)
+        self.deck_len[:] = DECK_SIZE
+        for seat in range(self.seats):
+            seats = np.full(self.n, seat)
+            for _ in range(HAND_SIZE):
+                self._append(all_games, seats, self._pop_deck(all_games))
+
+        top = self.deck[all_games, self.deck_len - 1]
+        redo = all_games[CARD_COLOR[top] == BLACK]
+        while redo.size:
+            # Wild start card goes back and the deck is reshuffled
+            length = self.deck_len[0]
+            order = np.argsort(self.rng.random((redo.size, length)), axis=1)
+            self.deck[redo, :length] = np.take_along_axis(self.deck[redo, :length], order, axis=1)
+            top = self.deck[redo, length - 1]
+            redo = redo[CARD_COLOR[top] == BLACK]
+        first = self._pop_deck(all_games)
+        self._push_discard(all_games, first)
+        self.color[:] = CARD_COLOR[first]
+
+    def load(self, states, py_rngs=None):
+        for g, state in enumerate(states):
+            self.deck[g, :len(state['deck'])] = state['deck']
+            self.deck_len[g] = len(state['deck'])
+            self.discard[g, :len(state['discard'])] = state['discard']
+            self.discard_len[g] = len(state['discard'])
+            for seat, hand in enumerate(state['hands']):
+                self.hands[g, seat, :len(hand)] = hand
+                self.hand_len[g, seat] = len(hand)
+            self.color[g] = state['color']
+            self.direction[g] = state['direction']
+            self.seat[g] = state['seat']
+        self.py_rngs = py_rngs
+
+    def run(self, max_turns=MAX_TURNS):
+        while self.active.any():
+            self.step()
+            self.active &= self.turns < max_turns
+
+    def step(self):
+        g = np.flatnonzero(self.active)
+        seat = self.seat[g].astype(np.intp)
+        length = self.hand_len[g, seat]
+        # Only look at as many slots as the biggest hand in play
+        width = max(int(length.max(initial=0)), 1)
+        hand = self.hands[g, seat, :width]
+        valid = np.arange(width) < length[:, None]
+
+        top = self.discard[g, self.discard_len[g] - 1]
+        hand_colors = CARD_COLOR[hand]
+        playable = valid & ((hand_colors == self.color[g][:, None]) |
+                            (CARD_VALUE[hand] == CARD_VALUE[top][:, None]) |
+                            (hand_colors == BLACK))
+        can_play = playable.any(1)
+        self.turns[g] += 1
+
+        self._play(g[can_play], seat[can_play], hand[can_play], length[can_play],
+                   valid[can_play], hand_colors[can_play], playable[can_play].argmax(1))
+        self._draw_turn(g[~can_play], seat[~can_play])
+
+    def _play(self, g, seat, hand, length, valid, hand_colors, idx):
+        if g.size == 0: return
+        rows = np.arange(g.size)
+        card = hand[rows, idx]
+
+        wild = hand_colors[rows, idx] == BLACK
+        self.color[g[~wild]] = hand_colors[rows[~wild], idx[~wild]]
+        if wild.any():
+            # Most common colour in hand, ties broken Red, Blue, Green, Yellow
+            counts = np.stack([(valid[wild] & (hand_colors[wild] == c)).sum(1) for c in range(4)], axis=1)
+            self.color[g[wild]] = counts.argmax(1)
+
+        width = hand.shape[1]
+        slots = np.arange(width)
+        src = np.minimum(slots + (slots >= idx[:, None]), width - 1)
+        self.hands[g, seat, :width] = np.take_along_axis(hand, src, axis=1)
+        self.hand_len[g, seat] = length - 1
+        self._push_discard(g, card)
+
+        value = CARD_VALUE[card]
+        self.direction[g[value == REVERSE]] *= -1
+        self._advance(g[value == SKIP])
+        for penalty, count in ((DRAW2, 2), (WILD4, 4)):
+            hit = g[value == penalty]
+            if hit.size == 0: continue
+            victim = ((self.seat[hit] + self.direction[hit]) % self.seats).astype(np.intp)
+            for _ in range(count):
+                # Penalties refill from the discard pile too, and stop short if both are empty
+                for game in hit[(self.deck_len[hit] == 0) & (self.discard_len[hit] > 1)]:
+                    self._reshuffle(game)
+                ok = self.deck_len[hit] > 0
+                self._append(hit[ok], victim[ok], self._pop_deck(hit[ok]))
+            self._advance(hit)
+
+        won = self.hand_len[g, seat] == 0
+        self.winner[g[won]] = seat[won]
+        self.active[g[won]] = False
+        self._advance(g[~won])
+
+    def _draw_turn(self, g, seat):
+        if g.size == 0: return
+        for game in g[(self.deck_len[g] == 0) & (self.discard_len[g] > 1)]:
+            self._reshuffle(game)
+        ok = self.deck_len[g] > 0
+        self._append(g[ok], seat[ok], self._pop_deck(g[ok]))
+        self._advance(g)
+
+    def _reshuffle(self, game):
+        top = self.discard[game, self.discard_len[game] - 1]
+        pile = self.discard[game, :self.discard_len[game] - 1]
+        if self.py_rngs is not None:
+            # Conformance mode: UnoEngine's lazy deck draws a random card per pop
+            # and nothing else touches a bot game's RNG until the next refill,
+            # so the whole draw order can be played out here
+            rng = self.py_rngs[game]
+            pile = pile.tolist()
+            order = []
+            for k in range(len(pile), 0, -1):
+                j = rng.randrange(k)
+                pile[j], pile[k - 1] = pile[k - 1], pile[j]
+                order.append(pile.pop())
+            order.reverse()
+        else:
+            order = self.rng.permutation(pile)
+        self.deck[game, :len(order)] = order
+        self.deck_len[game] = len(order)
+        self.discard[game, 0] = top
+        self.discard_len[game] = 1
+
+    def _pop_deck(self, g):
+        self.deck_len[g] -= 1
+        return self.deck[g, self.deck_len[g]]
+
+    def _push_discard(self, g, cards):
+        self.discard[g, self.discard_len[g]] = cards
+        self.discard_len[g] += 1
+
+    def _append(self, g, seat, cards):
+        self.hands[g, seat, self.hand_len[g, seat]] = cards
+        self.hand_len[g, seat] += 1
+
+    def _advance(self, g):
+        self.seat[g] = (self.seat[g] + self.direction[g]) % self.seats
+
+    def stats(self):
+        stats = SimStats(self.seats)
+        for g in range(self.n):
+            stats.add_game(int(self.winner[g]) if self.winner[g] >= 0 else None, int(self.turns[g]))
+        return stats
+
+# CONFORMANCE
+def encode_engine(engine):
+    hands = []
+    node = engine.players.head
+    for _ in range(engine.players.size):
+        hands.append([c.id for c in node.data.hand])
+        node = node.next
+    return {
+        'deck': [c.id for c in engine.deck.items],
+        'discard': [c.id for c in engine.discard.items],
+        'hands': hands,
+        'color': engine.current_color,
+        'direction': engine.direction,
+        'seat': engine.get_current_player().seat,
+    }
+
+def reference_result(engine, max_turns=MAX_TURNS):
+    turns = 0
+    while not engine.game_over and turns < max_turns:
+        player = engine.get_current_player()
+        move = engine.get_ai_move()
+        if move['type'] == 'play':
+            engine.play_card(player, move['idx'], move['color'])
+        else:
+            engine.draw_card(player)
+        turns += 1
+    return (engine.winner.seat if engine.game_over else None, turns)
+
+def check_conformance(n_games, base_seed=0, max_turns=MAX_TURNS):
+    states, rngs, expected = [], [], []
+    for i in range(n_games):
+        engine = new_bot_game(seed=base_seed + i)
+        states.append(encode_engine(engine))
+        rng = random.Random()
+        rng.setstate(engine.rng.getstate())
+        rngs.append(rng)
+        expected.append(reference_result(engine, max_turns))
+
+    batch = BatchEngine(n_games)
+    batch.load(states, rngs)
+    batch.run(max_turns)
+
+    mismatches = []
+    for g in range(n_games):
+        got = (int(batch.winner[g]) if batch.winner[g] >= 0 else None, int(batch.turns[g]))
+        if got != expected[g]:
+            mismatches.append((base_seed + g, expected[g], got))
+    return mismatches
+
+def run_batches(total_games, batch_size=4096, base_seed=0, max_turns=MAX_TURNS):
+    totals = SimStats()
+    start = time.perf_counter()
+    batch_index = 0
+    remaining = total_games
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        batch = BatchEngine(n, seed=(base_seed, batch_index))
+        batch.deal()
+        batch.run(max_turns)
+        totals.merge(batch.stats())
+        remaining -= n
+        batch_index += 1
+    return totals, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Run UNO games as batched NumPy arrays")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=4096, help="games stepped in lockstep")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--conformance", type=int, default=0, metavar="N",
+                        help="check N seeded games against UnoEngine instead of simulating")
+    args = parser.parse_args()
+
+    if args.conformance:
+        mismatches = check_conformance(args.conformance, args.seed, args.max_turns)
+        print(f"{args.conformance - len(mismatches)}/{args.conformance} games match UnoEngine")
+        for seed, expected, got in mismatches[:10]:
+            print(f"  seed {seed}: expected {expected}, got {got}")
+        raise SystemExit(1 if mismatches else 0)
+
+    stats, elapsed = run_batches(args.games, args.batch, args.seed, args.max_turns)
+    print(format_report(stats, elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import multiprocessing as mp
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from uno_engine import CARDS, UnoEngine, merge, merge_sort_hand
+from uno_engine.headless import MAX_TURNS, new_bot_game, run_chunk
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(ROOT, "bench_baseline.json")
+
+# CASES
+def ai_engine(seed=7, turns=10):
+    # Mid-game table with every seat on the default bot
+    engine = new_bot_game(seed=seed)
+    for _ in range(turns):
+        player = engine.get_current_player()
+        move = engine.get_ai_move()
+        if move['type'] == 'play':
+            engine.play_card(player, move['idx'], move['color'])
+        else:
+            engine.draw_card(player)
+    return engine
+
+def big_hand(size=30, seed=3):
+    engine = new_bot_game(seed=seed)
+    return [engine.deck.items[i % len(engine.deck.items)] for i in range(size)]
+
+def empty_deck_engine():
+    # Deck exhausted, discard holds everything else: the next draw reshuffles
+    engine = new_bot_game(seed=11)
+    top = engine.discard.pop()
+    engine.discard.items.extend(engine.deck.items)
+    engine.discard.push(top)
+    engine.deck.items = []
+    return engine
+
+def engine_cases():
+    hand7, hand30 = big_hand(7), big_hand(30)
+    left = merge_sort_hand(hand30[:15], 'color')
+    right = merge_sort_hand(hand30[15:], 'color')
+    engine = ai_engine()
+    card = engine.get_current_player().hand[0]
+    return [
+        ("merge_sort_hand[7]", lambda: merge_sort_hand(hand7, 'color'), None),
+        ("merge_sort_hand[30]", lambda: merge_sort_hand(hand30, 'color'), None),
+        ("merge[15+15]", lambda: merge(left, right, 'color'), None),
+        ("check_playable", lambda: engine.check_playable(card), None),
+        ("get_ai_move", engine.get_ai_move, None),
+        ("draw_card", lambda e: e.draw_card(e.get_current_player()), lambda: new_bot_game(seed=5)),
+        ("draw_card[reshuffle]", lambda e: e.draw_card(e.get_current_player()), empty_deck_engine),
+        ("initialize_game", lambda e: e.initialize_game(), lambda: UnoEngine(record_events=False, seed=9)),
+        ("headless_game", lambda: run_chunk((1234, 20, MAX_TURNS, 3, 1, False)), None, 20),
+    ]
+
+def import_cold(module):
+    # Fresh interpreter each time, so nothing is cached in sys.modules; run
+    # from the repo so uno_engine imports wherever bench.py was started from
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, cwd=ROOT)
+
+def worker_cold_start():
+    # What a spawned simulation worker pays before its first game finishes
+    with mp.get_context("spawn").Pool(1) as pool:
+        pool.apply(run_chunk, ((1, 1, MAX_TURNS, 3, 1, False),))
+
+def startup_cases():
+    return [
+        ("cold_import[python]", lambda: import_cold("sys"), None),
+        ("cold_import[uno_engine]", lambda: import_cold("uno_engine"), None),
+        ("cold_import[pixelunogame]", lambda: import_cold("pixelunogame"), None),
+        ("worker_cold_start", worker_cold_start, None),
+    ]
+
+def ui_cases():
+    # Needs a display; uses a virtual one when pyvirtualdisplay is installed
+    import tkinter as tk
+    display = None
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        try:
+            from pyvirtualdisplay import Display
+        except ImportError:
+            return [], "no display"
+        display = Display(visible=False, size=(1200, 800))
+        display.start()
+        root = tk.Tk()
+    from pixelunogame import ModernCard, UnoGUI
+    root.withdraw()
+    app = UnoGUI(root)
+    app.start_game()
+    app.animating = True  # keep run_ai from being scheduled
+    card = CARDS[0]
+
+    def new_card():
+        ModernCard(app.cards_frame, card).destroy()
+
+    def full_rebuild():
+        for mc in app.player_card_widgets: mc.destroy()
+        app.player_card_widgets = []
+        app.update_ui()
+
+    cases = [
+        ("ModernCard", new_card, None),
+        ("update_ui", app.update_ui, None),
+        ("update_ui[rebuild_hand]", full_rebuild, None),
+    ]
+
+    def cleanup():
+        root.destroy()
+        if display: display.stop()
+    return cases, cleanup
+
+# MEASUREMENT
+def time_case(fn, setup, min_time):
+    samples = []
+    calls = 0
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(samples) < 5:
+        if setup:
+            arg = setup()
+            start = time.perf_counter()
+            fn(arg)
+            elapsed = time.perf_counter() - start
+            n = 1
+        else:
+            # Batch fast calls so timer overhead doesn't dominate
+            n = max(1, min(1000, calls // 10 + 1))
+            start = time.perf_counter()
+            for _ in range(n): fn()
+            elapsed = time.perf_counter() - start
+        calls += n
+        samples.append(elapsed / n)
+    samples.sort()
+    return {'calls': calls, 'median_us': samples[len(samples) // 2] * 1e6, 'best_us': samples[0] * 1e6}
+
+def measure_allocs(fn, setup):
+    arg = setup() if setup else None
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before_mem, _ = tracemalloc.get_traced_memory()
+    before_blocks = sys.getallocatedblocks()
+    fn(arg) if setup else fn()
+    blocks = sys.getallocatedblocks() - before_blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'alloc_peak_bytes': peak - before_mem, 'net_blocks': blocks}
+
+def run_cases(cases, min_time, results):
+    for case in cases:
+        name, fn, setup = case[:3]
+        per = case[3] if len(case) > 3 else 1
+        timing = time_case(fn, setup, min_time)
+        if per > 1:
+            timing = {'calls': timing['calls'] * per, 'median_us': timing['median_us'] / per,
+                      'best_us': timing['best_us'] / per}
+        timing.update(measure_allocs(fn, setup))
+        results[name] = timing
+        print(f"{name:26} {timing['median_us']:10.2f} us/call  best {timing['best_us']:9.2f}  "
+              f"peak {timing['alloc_peak_bytes']:8} B  blocks {timing['net_blocks']:+d}")
+
+# BASELINE
+def compare(results, baseline, threshold, skip=()):
+    regressions = []
+    for name, base in baseline['cases'].items():
+        now = results.get(name)
+        if now is None or name in skip: continue
+        ratio = now['median_us'] / base['median_us'] if base['median_us'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append((name, base['median_us'], now['median_us'], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine, sorting and UI hot paths")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds spent timing each case")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown before failing (0.3 = 30%%)")
+    parser.add_argument("--no-ui", action="store_true")
+    parser.add_argument("--no-startup", action="store_true", help="skip interpreter and worker cold-start cases")
+    parser.add_argument("--gate-startup", action="store_true",
+                        help="fail on cold-start regressions too (they swing with disk cache and machine load)")
+    args = parser.parse_args()
+
+    results = {}
+    run_cases(engine_cases(), args.min_time, results)
+    if not args.no_startup:
+        run_cases(startup_cases(), args.min_time, results)
+    if not args.no_ui:
+        cases, cleanup = ui_cases()
+        if cases:
+            run_cases(cases, args.min_time, results)
+            cleanup()
+        else:
+            print(f"UI cases skipped: {cleanup}")
+
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'cases': results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline)")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # Cold starts are reported but, unless asked, not gated: they are process
+    # spawns and disk reads, far noisier than the in-process cases
+    skip = () if args.gate_startup else {case[0] for case in startup_cases()}
+    regressions = compare(results, baseline, args.threshold, skip)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before:.2f} -> {after:.2f} us/call ({(ratio - 1) * 100:+.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold * 100:.0f}% of baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from uno_engine import BLACK, COLOR_IDS, MAX_PLAYERS, WILD
+from uno_engine.headless import MAX_TURNS, chunk_seed, new_bot_game
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+# ENCODING
+# One fixed-width row per bot decision. Faces are the 54 distinct cards:
+# colour * 13 + value for coloured cards, then Wild and Wild4.
+N_FACES = 54
+DRAW = N_FACES
+NO_COLOR = BLACK
+
+def face_of(card):
+    if card.color_id == BLACK: return 52 + card.value_id - WILD
+    return card.color_id * 13 + card.value_id
+
+COLUMNS = {
+    'hand': (np.uint8, (N_FACES,)),              # cards held per face
+    'top': (np.uint8, ()),                       # face on the discard pile
+    'color': (np.uint8, ()),                     # colour in play
+    'direction': (np.int8, ()),
+    'seat': (np.uint8, ()),
+    'opponents': (np.uint8, (MAX_PLAYERS - 1,)), # hand sizes in turn order, 0 past the last seat
+    'deck': (np.uint16, ()),                     # cards left to draw
+    'legal': (np.uint64, ()),                    # bit per playable face, DRAW bit when none
+    'move': (np.uint8, ()),                      # face played, or DRAW
+    'chosen': (np.uint8, ()),                    # declared colour, NO_COLOR unless a wild
+    'outcome': (np.int8, ()),                    # 1 won, 0 lost, -1 hit the turn limit
+    'game': (np.uint32, ()),
+}
+
+def empty_columns(rows):
+    return {name: np.zeros((rows,) + shape, dtype) for name, (dtype, shape) in COLUMNS.items()}
+
+class GameRecorder:
+    # Rows for one game are staged here until the outcome is known
+    def __init__(self, max_turns=MAX_TURNS):
+        self.cols = empty_columns(max_turns)
+        self.rows = 0
+
+    def record(self, engine, player, move):
+        i = self.rows
+        cols = self.cols
+        hand = cols['hand'][i]
+        hand[:] = 0
+        for card in player.hand:
+            hand[face_of(card)] += 1
+        cols['top'][i] = face_of(engine.discard.peek())
+        cols['color'][i] = engine.current_color
+        cols['direction'][i] = engine.direction
+        cols['seat'][i] = player.seat
+        opponents = cols['opponents'][i]
+        opponents[:] = 0
+        node = engine.players.node_for(player.seat)
+        for k in range(engine.players.size - 1):
+            node = node.next if engine.direction == 1 else node.prev
+            opponents[k] = len(node.data.hand)
+        cols['deck'][i] = engine.deck.size()
+        legal = 0
+        for idx in engine.playable_indices(player):
+            legal |= 1 << face_of(player.hand[idx])
+        cols['legal'][i] = legal or 1 << DRAW
+        if move['type'] == 'play':
+            cols['move'][i] = face_of(move['card_obj'])
+            cols['chosen'][i] = COLOR_IDS[move['color']] if move['color'] else NO_COLOR
+        else:
+            cols['move'][i] = DRAW
+            cols['chosen'][i] = NO_COLOR
+        self.rows += 1
+
+    def finish(self, engine, game_id):
+        n = self.rows
+        if engine.game_over:
+            self.cols['outcome'][:n] = self.cols['seat'][:n] == engine.winner.seat
+        else:
+            self.cols['outcome'][:n] = -1
+        self.cols['game'][:n] = game_id
+        self.rows = 0
+        return n
+
+# SHARDS
+def shrink_npy(path, rows):
+    # Rewrites the shape in a preallocated .npy header (same header length,
+    # padded with spaces) and cuts the unused tail off the file
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran, dtype = read_header(f)
+        offset = f.tell()
+        prefix = 10 if version == (1, 0) else 12
+        header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran,
+                       'shape': (rows,) + shape[1:]})
+        f.seek(prefix)
+        f.write(header.encode("latin1").ljust(offset - prefix - 1) + b"\n")
+        f.truncate(offset + rows * dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64)))
+
+class ShardWriter:
+    # Rows collect in a fixed chunk buffer; each full chunk is copied into
+    # the open shard's memory-mapped columns, so memory stays flat however
+    # many games are exported
+    def __init__(self, out_dir, prefix, shard_rows=1 << 20, chunk_rows=1 << 14):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.shard_rows = shard_rows
+        self.chunk_rows = chunk_rows
+        self.chunk = empty_columns(chunk_rows)
+        self.chunk_len = 0
+        self.shard = None
+        self.shard_len = 0
+        self.shards = []
+
+    def append(self, cols, n):
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_rows - self.chunk_len)
+            for name, buf in self.chunk.items():
+                buf[self.chunk_len:self.chunk_len + take] = cols[name][start:start + take]
+            self.chunk_len += take
+            start += take
+            if self.chunk_len == self.chunk_rows: self.flush()
+
+    def flush(self):
+        done = 0
+        while done < self.chunk_len:
+            if self.shard is None: self.open_shard()
+            take = min(self.chunk_len - done, self.shard_rows - self.shard_len)
+            for name, column in self.shard.items():
+                column[self.shard_len:self.shard_len + take] = self.chunk[name][done:done + take]
+            self.shard_len += take
+            done += take
+            if self.shard_len == self.shard_rows: self.close_shard()
+        self.chunk_len = 0
+
+    def open_shard(self):
+        name = f"{self.prefix}-{len(self.shards):04d}"
+        self.shard = {}
+        for column, (dtype, shape) in COLUMNS.items():
+            path = os.path.join(self.out_dir, f"{name}.{column}.npy")
+            self.shard[column] = np.lib.format.open_memmap(path, mode="w+", dtype=dtype,
+                                                           shape=(self.shard_rows,) + shape)
+        self.shards.append({'name': name, 'rows': 0})
+        self.shard_len = 0
+
+    def close_shard(self):
+        self.shards[-1]['rows'] = self.shard_len
+        paths = []
+        for array in self.shard.values():
+            array.flush()
+            paths.append(array.filename)
+        # Drop the maps before a short last shard is truncated
+        self.shard = None
+        if self.shard_len < self.shard_rows:
+            for path in paths:
+                shrink_npy(path, self.shard_len)
+
+    def close(self):
+        self.flush()
+        if self.shard is not None: self.close_shard()
+        return self.shards
+
+# EXPORT
+def export_chunk(task):
+    seed, n_games, first_game, max_turns, players, decks, out_dir, prefix, shard_rows = task
+    seeds = random.Random(seed)
+    recorder = GameRecorder(max_turns)
+    writer = ShardWriter(out_dir, prefix, shard_rows)
+    for game_id in range(first_game, first_game + n_games):
+        engine = new_bot_game(seed=seeds.getrandbits(64), players=players, decks=decks)
+        turns = 0
+        while not engine.game_over and turns < max_turns:
+            player = engine.get_current_player()
+            move = engine.get_ai_move()
+            recorder.record(engine, player, move)
+            if move['type'] == 'play':
+                engine.play_card(player, move['idx'], move['color'])
+            else:
+                engine.draw_card(player)
+            turns += 1
+        writer.append(recorder.cols, recorder.finish(engine, game_id))
+    return writer.close()
+
+def write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def export(out_dir, total_games, workers=None, chunk_size=1000, base_seed=0, max_turns=MAX_TURNS,
+           players=3, decks=1, shard_rows=1 << 20, on_progress=None):
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    for index, first in enumerate(range(0, total_games, chunk_size)):
+        # Every chunk writes its own shards, so workers never share a file
+        tasks.append((chunk_seed(base_seed, index), min(chunk_size, total_games - first), first, max_turns,
+                      players, decks, out_dir, f"c{index:05d}", shard_rows))
+    shards = []
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(export_chunk, tasks)
+        for done in results:
+            shards.extend(done)
+            if on_progress: on_progress(shards, time.perf_counter() - start)
+    else:
+        with mp.Pool(workers) as pool:
+            for done in pool.imap_unordered(export_chunk, tasks):
+                shards.extend(done)
+                if on_progress: on_progress(shards, time.perf_counter() - start)
+    shards.sort(key=lambda s: s['name'])
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'columns': {name: {'dtype': np.dtype(dtype).str, 'shape': list(shape)}
+                    for name, (dtype, shape) in COLUMNS.items()},
+        'shards': shards,
+        'rows': sum(s['rows'] for s in shards),
+        'games': total_games,
+        'config': {'players': players, 'decks': decks, 'base_seed': base_seed, 'max_turns': max_turns},
+    }
+    write_manifest(out_dir, manifest)
+    return manifest, time.perf_counter() - start
+
+# READER
+class Dataset:
+    # Columns are opened as read-only memory maps; slicing them gives views,
+    # so nothing is read from disk until it is touched
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version {self.manifest.get('version')}")
+        self.shards = self.manifest['shards']
+        self.columns = list(self.manifest['columns'])
+        self.offsets = np.cumsum([0] + [s['rows'] for s in self.shards])
+        self.open = {}
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def shard(self, i):
+        if i not in self.open:
+            name = self.shards[i]['name']
+            self.open[i] = {column: np.load(os.path.join(self.path, f"{name}.{column}.npy"), mmap_mode="r")
+                            for column in self.columns}
+        return self.open[i]
+
+    def iter_shards(self):
+        for i in range(len(self.shards)):
+            yield self.shard(i)
+
+    def iter_batches(self, batch_size=4096):
+        # Views into each shard; a batch never spans two shards
+        for cols in self.iter_shards():
+            rows = len(cols['game'])
+            for start in range(0, rows, batch_size):
+                yield {name: column[start:start + batch_size] for name, column in cols.items()}
+
+    def row(self, index):
+        i = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        local = index - int(self.offsets[i])
+        return {name: column[local] for name, column in self.shard(i).items()}
+
+    def sample(self, n, rng=None):
+        # Uniform over all rows; only the sampled rows are read into the batch
+        rng = rng if rng is not None else np.random.default_rng()
+        picks = np.sort(rng.integers(0, len(self), n))
+        shard_ids = np.searchsorted(self.offsets, picks, side="right") - 1
+        batch = {}
+        for i in np.unique(shard_ids):
+            local = picks[shard_ids == i] - self.offsets[i]
+            for name, column in self.shard(int(i)).items():
+                batch.setdefault(name, []).append(column[local])
+        return {name: np.concatenate(parts) for name, parts in batch.items()}
+
+def describe(dataset):
+    rows = len(dataset)
+    lines = [f"Rows:    {rows:,} in {len(dataset.shards)} shards",
+             f"Games:   {dataset.manifest['games']:,}"]
+    won = sum(int((cols['outcome'] == 1).sum()) for cols in dataset.iter_shards())
+    draws = sum(int((cols['move'] == DRAW).sum()) for cols in dataset.iter_shards())
+    lines.append(f"Winning-seat rows: {won / max(rows, 1) * 100:.1f}%")
+    lines.append(f"Draw moves:        {draws / max(rows, 1) * 100:.1f}%")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export bot decisions as columnar .npy shards, or inspect an export")
+    sub = parser.add_subparsers(dest="command", required=True)
+    out = sub.add_parser("export")
+    out.add_argument("out_dir")
+    out.add_argument("--games", type=int, default=10000)
+    out.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    out.add_argument("--chunk", type=int, default=1000, help="games per worker task")
+    out.add_argument("--seed", type=int, default=0)
+    out.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    out.add_argument("--players", type=int, default=3)
+    out.add_argument("--decks", type=int, default=1)
+    out.add_argument("--shard-rows", type=int, default=1 << 20, help="rows per shard file")
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        print(describe(Dataset(args.path)))
+        return
+
+    def progress(shards, elapsed):
+        rows = sum(s['rows'] for s in shards)
+        print(f"\r{rows:,} rows, {rows / max(elapsed, 1e-9):,.0f} rows/sec", end="", flush=True)
+
+    manifest, elapsed = export(args.out_dir, args.games, args.workers, args.chunk, args.seed, args.max_turns,
+                               args.players, args.decks, args.shard_rows, progress)
+    print()
+    print(f"Wrote {manifest['rows']:,} rows in {len(manifest['shards'])} shards to {args.out_dir} "
+          f"({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
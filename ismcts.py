@@ -0,0 +1,230 @@
+import argparse
+import math
+import multiprocessing as mp
+import random
+import time
+
+from uno_engine import BLACK, CARDS, COLOR_NAMES, Player, UnoEngine
+from uno_engine.headless import new_bot_game, play_headless_game
+
+ROLLOUT_TURNS = 500
+
+# STATE
+def snapshot(engine):
+    # Only seats still at the table, renumbered in seating order, so a
+    # player who left is never dealt back in
+    players = [p for p in engine.seats if p.seat in engine.players]
+    return {
+        'deck': [c.id for c in engine.deck.items],
+        'discard': [c.id for c in engine.discard.items],
+        'hands': [[c.id for c in p.hand] for p in players],
+        'names': [p.name for p in players],
+        'seat': players.index(engine.get_current_player()),
+        'direction': engine.direction,
+        'color': engine.current_color,
+    }
+
+def build_engine(state, seed=None):
+    engine = UnoEngine(record_events=False, seed=seed)
+    engine.deck.items = [CARDS[i] for i in state['deck']]
+    engine.discard.items = [CARDS[i] for i in state['discard']]
+    for name, hand in zip(state['names'], state['hands']):
+        player = Player(name, is_ai=True)
+        player.hand = [CARDS[i] for i in hand]
+        engine.add_player(player)
+    engine.players.current = engine.players.node_for(state['seat'])
+    engine.direction = state['direction']
+    engine.current_color = state['color']
+    return engine
+
+def determinize(state, viewer, rng):
+    # Everything the viewer can't see is dealt back out at random
+    hidden = list(state['deck'])
+    for seat, hand in enumerate(state['hands']):
+        if seat != viewer: hidden.extend(hand)
+    rng.shuffle(hidden)
+    hands = []
+    pos = 0
+    for seat, hand in enumerate(state['hands']):
+        if seat == viewer:
+            hands.append(hand)
+        else:
+            hands.append(hidden[pos:pos + len(hand)])
+            pos += len(hand)
+    return build_engine(dict(state, hands=hands, deck=hidden[pos:]), seed=rng.getrandbits(64))
+
+# MOVES
+# A play is (color_id, value_id, chosen_color_id or None); None is a draw.
+# Cards with the same face are the same move.
+def legal_moves(engine):
+    player = engine.get_current_player()
+    moves = []
+    for i in engine.playable_indices(player):
+        card = player.hand[i]
+        if card.color_id == BLACK:
+            options = [(card.color_id, card.value_id, c) for c in range(BLACK)]
+        else:
+            options = [(card.color_id, card.value_id, None)]
+        for move in options:
+            if move not in moves: moves.append(move)
+    return moves or [None]
+
+def find_card(player, move):
+    for i, card in enumerate(player.hand):
+        if card.color_id == move[0] and card.value_id == move[1]:
+            return i
+    return None
+
+def apply_move(engine, move):
+    player = engine.get_current_player()
+    if move is None:
+        engine.draw_card(player)
+    else:
+        chosen = COLOR_NAMES[move[2]] if move[2] is not None else None
+        engine.play_card(player, find_card(player, move), chosen)
+
+def move_dict(player, move):
+    if move is None: return {'type': 'draw'}
+    idx = find_card(player, move)
+    chosen = COLOR_NAMES[move[2]] if move[2] is not None else None
+    return {'type': 'play', 'idx': idx, 'color': chosen, 'card_obj': player.hand[idx]}
+
+# SEARCH
+class TreeNode:
+    __slots__ = ('parent', 'move', 'seat', 'children', 'visits', 'wins', 'avails')
+
+    def __init__(self, parent, move, seat):
+        self.parent = parent
+        self.move = move
+        self.seat = seat
+        self.children = {}
+        self.visits = 0
+        self.wins = 0
+        self.avails = 1
+
+    def ucb(self, exploration):
+        if self.visits == 0: return math.inf
+        return self.wins / self.visits + exploration * math.sqrt(math.log(self.avails) / self.visits)
+
+def search(task):
+    state, viewer, budget_ms, seed, exploration = task
+    rng = random.Random(seed)
+    root = TreeNode(None, None, None)
+    rollouts = 0
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000
+    while time.perf_counter() < deadline:
+        engine = determinize(state, viewer, rng)
+        node = root
+        while not engine.game_over:
+            moves = legal_moves(engine)
+            for move in moves:
+                if move in node.children: node.children[move].avails += 1
+            untried = [m for m in moves if m not in node.children]
+            if untried:
+                move = rng.choice(untried)
+                child = TreeNode(node, move, engine.get_current_player().seat)
+                node.children[move] = child
+                node = child
+                apply_move(engine, move)
+                break
+            node = max((node.children[m] for m in moves), key=lambda c: c.ucb(exploration))
+            apply_move(engine, node.move)
+        play_headless_game(engine, ROLLOUT_TURNS)
+        winner = engine.winner.seat if engine.game_over else None
+        rollouts += 1
+        while node is not None:
+            node.visits += 1
+            if node.seat is not None and node.seat == winner: node.wins += 1
+            node = node.parent
+    stats = {move: (child.visits, child.wins) for move, child in root.children.items()}
+    return stats, rollouts, time.perf_counter() - start
+
+class ISMCTSStrategy:
+    def __init__(self, budget_ms=200, workers=1, exploration=0.7, seed=None):
+        self.budget_ms = budget_ms
+        self.workers = workers
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.last_stats = {'rollouts': 0, 'elapsed': 0.0, 'rollouts_per_sec': 0.0}
+
+    def __getstate__(self):
+        # The worker pool stays with the original; a pickled copy makes its own
+        state = dict(self.__dict__)
+        state['pool'] = None
+        return state
+
+    def choose_move(self, engine, player):
+        moves = legal_moves(engine)
+        if len(moves) == 1:
+            self.last_stats = {'rollouts': 0, 'elapsed': 0.0, 'rollouts_per_sec': 0.0}
+            return move_dict(player, moves[0])
+
+        state = snapshot(engine)
+        tasks = [(state, state['seat'], self.budget_ms, self.rng.getrandbits(32), self.exploration)
+                 for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [search(tasks[0])]
+        else:
+            if self.pool is None: self.pool = mp.Pool(self.workers)
+            results = self.pool.map(search, tasks)
+
+        # Root parallelisation: every worker grows its own tree, visits are summed
+        visits = {}
+        for stats, _, _ in results:
+            for move, (n, _) in stats.items():
+                visits[move] = visits.get(move, 0) + n
+        rollouts = sum(r[1] for r in results)
+        elapsed = max(r[2] for r in results)
+        self.last_stats = {'rollouts': rollouts, 'elapsed': elapsed,
+                           'rollouts_per_sec': rollouts / elapsed if elapsed else 0.0}
+        best = max(moves, key=lambda m: visits.get(m, 0))
+        return move_dict(player, best)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+# EVALUATION
+def main():
+    parser = argparse.ArgumentParser(description="Play an ISMCTS bot against the default heuristic bots")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=100, help="milliseconds per move")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    strategy = ISMCTSStrategy(args.budget, args.workers, seed=args.seed)
+    wins = finished = rollouts = 0
+    search_time = 0.0
+    try:
+        for game in range(args.games):
+            engine = new_bot_game(seed=args.seed + game)
+            engine.seats[args.seat].strategy = strategy
+            turns = 0
+            while not engine.game_over and turns < ROLLOUT_TURNS:
+                player = engine.get_current_player()
+                move = engine.get_ai_move()
+                if player.strategy:
+                    rollouts += strategy.last_stats['rollouts']
+                    search_time += strategy.last_stats['elapsed']
+                if move['type'] == 'play':
+                    engine.play_card(player, move['idx'], move['color'])
+                else:
+                    engine.draw_card(player)
+                turns += 1
+            if engine.game_over:
+                finished += 1
+                if engine.winner.seat == args.seat: wins += 1
+    finally:
+        strategy.close()
+
+    print(f"ISMCTS seat {args.seat}: won {wins}/{finished} finished games ({wins / max(finished, 1) * 100:.1f}%)")
+    print(f"Rollouts/sec: {rollouts / max(search_time, 1e-9):,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,294 +1,15 @@
 import tkinter as tk
 from tkinter import messagebox
+import math
+import queue
 import random
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
 
-# DATA STRUCTURES
-class Node:
-    def __init__(self, data):
-        self.data = data
-        self.next = None
-        self.prev = None
-
-class ActionQueue:
-    def __init__(self, capacity=8):
-        self.items = []
-        self.capacity = capacity
-
-    def enqueue(self, item):
-        if len(self.items) >= self.capacity:
-            self.items.pop(0) 
-        self.items.append(item)
-
-    def get_all(self):
-        return self.items
-
-class CardStack:
-    def __init__(self):
-        self.items = []
-
-    def push(self, item):
-        self.items.append(item)
-
-    def pop(self):
-        if not self.is_empty():
-            return self.items.pop()
-        return None
-
-    def peek(self):
-        if not self.is_empty():
-            return self.items[-1]
-        return None
-
-    def is_empty(self):
-        return len(self.items) == 0
-
-    def size(self):
-        return len(self.items)
-
-    def shuffle(self):
-        random.shuffle(self.items)
-
-class CircularDoublyLinkedList:
-    def __init__(self):
-        self.head = None
-        self.current = None
-        self.size = 0
-
-    def add_player(self, player):
-        new_node = Node(player)
-        if not self.head:
-            self.head = new_node
-            self.head.next = self.head
-            self.head.prev = self.head
-            self.current = self.head
-        else:
-            tail = self.head.prev
-            tail.next = new_node
-            new_node.prev = tail
-            new_node.next = self.head
-            self.head.prev = new_node
-        self.size += 1
-
-    def get_current_player(self):
-        return self.current.data
-
-    def move_next(self):
-        self.current = self.current.next
-
-    def move_prev(self):
-        self.current = self.current.prev
-
-# SORTING
-def merge_sort_hand(hand, sort_key='color'):
-    if len(hand) <= 1:
-        return hand
-
-    mid = len(hand) // 2
-    left_half = merge_sort_hand(hand[:mid], sort_key)
-    right_half = merge_sort_hand(hand[mid:], sort_key)
-
-    return merge(left_half, right_half, sort_key)
-
-def merge(left, right, sort_key):
-    sorted_list = []
-    i = j = 0
-
-    def get_val_weight(card):
-        if card.value.isdigit(): return int(card.value)
-        mapping = {'Skip': 10, 'Reverse': 11, 'Draw2': 12, 'Wild': 13, 'Wild4': 14}
-        return mapping.get(card.value, 0)
-
-    while i < len(left) and j < len(right):
-        condition = False
-        if sort_key == 'color':
-            if left[i].color < right[j].color:
-                condition = True
-            elif left[i].color == right[j].color:
-                if get_val_weight(left[i]) < get_val_weight(right[j]):
-                    condition = True
-        else:
-             if get_val_weight(left[i]) < get_val_weight(right[j]):
-                 condition = True
-        
-        if condition:
-            sorted_list.append(left[i])
-            i += 1
-        else:
-            sorted_list.append(right[j])
-            j += 1
-
-    sorted_list.extend(left[i:])
-    sorted_list.extend(right[j:])
-    return sorted_list
-
-# GAME LOGIC
-class Card:
-    def __init__(self, color, value):
-        self.color = color 
-        self.value = value
-    
-    def __repr__(self):
-        return f"{self.color} {self.value}"
-
-class Player:
-    def __init__(self, name, is_ai=False):
-        self.name = name
-        self.hand = [] 
-        self.is_ai = is_ai
-
-class UnoEngine:
-    def __init__(self):
-        self.deck = CardStack()
-        self.discard = CardStack()
-        self.players = CircularDoublyLinkedList()
-        self.logs = ActionQueue()
-        self.direction = 1 
-        self.game_over = False
-        self.winner = None
-        self.status_msg = "Game Started"
-
-    def log(self, msg):
-        self.logs.enqueue(msg)
-
-    def initialize_game(self):
-        colors = ['Red', 'Blue', 'Green', 'Yellow']
-        values = [str(i) for i in range(10)] + ['Skip', 'Reverse', 'Draw2'] * 2
-        
-        all_cards = []
-        for c in colors:
-            for v in values:
-                all_cards.append(Card(c, v))
-        
-        for _ in range(4): all_cards.append(Card('Black', 'Wild'))
-        for _ in range(4): all_cards.append(Card('Black', 'Wild4'))
-        
-        self.deck.items = all_cards 
-        self.deck.shuffle()
-
-        self.players.add_player(Player("You"))
-        self.players.add_player(Player("Bot 1", is_ai=True))
-        self.players.add_player(Player("Bot 2", is_ai=True))
-
-        curr = self.players.head
-        for _ in range(3): 
-            for _ in range(7): 
-                curr.data.hand.append(self.deck.pop())
-            curr = curr.next
-
-        first_card = self.deck.pop()
-        while first_card.color == 'Black': 
-            self.deck.push(first_card)
-            self.deck.shuffle()
-            first_card = self.deck.pop()
-        self.discard.push(first_card)
-        self.log(f"Start Card: {first_card.color} {first_card.value}")
-
-    def get_current_player(self):
-        return self.players.get_current_player()
-
-    def check_playable(self, card):
-        top = self.discard.peek()
-        return (card.color == top.color or 
-                card.value == top.value or 
-                card.color == 'Black')
-
-    def next_turn(self):
-        if self.direction == 1:
-            self.players.move_next()
-        else:
-            self.players.move_prev()
-
-    def handle_special_card(self, card):
-        if card.value == 'Reverse':
-            self.direction *= -1
-            self.log("Direction Reversed!")
-        elif card.value == 'Skip':
-            self.log("Next player skipped!")
-            self.next_turn()
-        elif card.value == 'Draw2':
-            temp_node = self.players.current.next if self.direction == 1 else self.players.current.prev
-            victim = temp_node.data
-            victim.hand.append(self.deck.pop())
-            victim.hand.append(self.deck.pop())
-            self.log(f"{victim.name} drew 2 and skipped!")
-            self.next_turn()
-        elif card.value == 'Wild4':
-            temp_node = self.players.current.next if self.direction == 1 else self.players.current.prev
-            victim = temp_node.data
-            for _ in range(4): victim.hand.append(self.deck.pop())
-            self.log(f"{victim.name} drew 4 and skipped!")
-            self.next_turn()
-
-    def play_card(self, player, card_index, chosen_color=None):
-        card = player.hand.pop(card_index)
-        
-        if card.color == 'Black':
-            if chosen_color:
-                card.color = chosen_color
-                self.log(f"{player.name} changed color to {chosen_color}")
-            else:
-                colors = ['Red', 'Blue', 'Green', 'Yellow']
-                card.color = random.choice(colors)
-                self.log(f"{player.name} (AI) chose {card.color}")
-
-        self.discard.push(card)
-        self.log(f"{player.name} played {card.value}")
-        
-        self.handle_special_card(card)
-        
-        if len(player.hand) == 0:
-            self.game_over = True
-            self.winner = player
-            self.status_msg = f"{player.name} WINS!"
-            return True 
-        
-        self.next_turn()
-        return False
-
-    def draw_card(self, player):
-        if self.deck.is_empty():
-            if self.discard.size() > 1:
-                # Reshuffle Logic
-                top = self.discard.pop()
-                self.deck.items = self.discard.items[:] 
-                self.discard.items = [top] 
-                self.deck.shuffle()
-                self.log("Deck Reshuffled")
-            else:
-                # True Empty Logic
-                self.log("Deck Empty!")
-                self.next_turn()
-                return False # Return False to signal failure
-
-        card = self.deck.pop()
-        player.hand.append(card)
-        self.log(f"{player.name} drew a card")
-        self.next_turn()
-        return True # Return True for success
-
-    def get_ai_move(self):
-        p = self.get_current_player()
-        if not p.is_ai: return None
-
-        playable = []
-        for i, card in enumerate(p.hand):
-            if self.check_playable(card):
-                playable.append(i)
-        
-        if playable:
-            chosen_idx = playable[0]
-            card = p.hand[chosen_idx]
-            chosen_color = None
-            if card.color == 'Black':
-                counts = {'Red':0, 'Blue':0, 'Green':0, 'Yellow':0}
-                for c in p.hand:
-                    if c.color != 'Black': counts[c.color] += 1
-                if not counts: counts = {'Red': 1} 
-                chosen_color = max(counts, key=counts.get)
-            
-            return {'type': 'play', 'idx': chosen_idx, 'color': chosen_color, 'card_obj': card}
-        else:
-            return {'type': 'draw'}
+from uno_engine import BLACK, COLOR_NAMES, ENGINE_HOOKS, Profiler, UnoEngine
 
 # TKINTER UI
 
@@ -299,29 +20,100 @@ COLORS = {
     'MenuBG': '#6495ED' 
 }
 
+# SPRITES
+class SpriteCache:
+    # LRU of rendered PhotoImages. Widgets showing a sprite keep their own
+    # reference, so eviction never blanks a card that is on screen.
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        img = self.images.get(key)
+        if img is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = render()
+        self.images[key] = img
+        if len(self.images) > self.capacity:
+            self.images.popitem(last=False)
+        return img
+
+SPRITES = SpriteCache()
+
+def put_rect(img, color, x1, y1, x2, y2):
+    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+    if x2 > x1 and y2 > y1:
+        img.put(color, to=(x1, y1, x2, y2))
+
+def put_oval(img, color, x1, y1, x2, y2, width=None):
+    # Filled ellipse, or a ring of the given width, one scanline at a time
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    rx, ry = (x2 - x1) / 2, (y2 - y1) / 2
+    for y in range(int(y1), int(math.ceil(y2))):
+        dy = (y + 0.5 - cy) / ry
+        if abs(dy) >= 1: continue
+        outer = rx * math.sqrt(1 - dy * dy)
+        inner_dy = (y + 0.5 - cy) / (ry - width) if width else 1
+        if not width or abs(inner_dy) >= 1:
+            put_rect(img, color, cx - outer, y, cx + outer, y + 1)
+        else:
+            inner = (rx - width) * math.sqrt(1 - inner_dy * inner_dy)
+            put_rect(img, color, cx - outer, y, cx - inner, y + 1)
+            put_rect(img, color, cx + inner, y, cx + outer, y + 1)
+
+def render_card_face(master, fill, w, h):
+    img = tk.PhotoImage(master=master, width=w, height=h)
+    pad = 2
+    put_rect(img, "black", pad+3, pad+3, w-pad, h-pad)
+    put_rect(img, "white", pad+4, pad+4, w-pad-1, h-pad-1)
+    put_rect(img, fill, pad+6, pad+6, w-pad-3, h-pad-3)
+    put_oval(img, "white", 10, 25, w-10, h-25)
+    return img
+
+def render_card_back(master, w, h):
+    img = tk.PhotoImage(master=master, width=w, height=h)
+    put_rect(img, "white", 1, 1, w-1, h-1)
+    put_rect(img, "#e74c3c", 3, 3, w-3, h-3)
+    put_oval(img, "yellow", 15, 35, w-15, h-35, width=2)
+    return img
+
+def render_pixel_card(master, fill, w, h):
+    # Same layout as draw_pixel_card, offset by its 2px border
+    img = tk.PhotoImage(master=master, width=w+2, height=h+2)
+    put_rect(img, "black", 0, 0, w+2, h+2)
+    put_rect(img, "white", 2, 2, w, h)
+    put_rect(img, fill, 6, 6, w-4, h-4)
+    put_oval(img, "white", 11, 1+h/4, w-9, 1+h*3/4)
+    return img
+
 class ModernCard(tk.Canvas):
-    def __init__(self, master, card, width=80, height=120, command=None, state="normal"):
+    def __init__(self, master, card, width=80, height=120, command=None, state="normal", color=None):
         super().__init__(master, width=width, height=height, bg=COLORS['BG'], highlightthickness=0)
         self.card = card
         self.command = command
         self.state = state
         self.width = width
         self.height = height
-        self.fill_color = COLORS.get(card.color, '#333')
-        if card.color == "Black" and card.value in ["Wild", "Wild4"]:
+        # color overrides the face colour, e.g. the declared colour of a played wild
+        self.fill_color = COLORS.get(color or card.color, '#333')
+        if not color and card.color == "Black" and card.value in ["Wild", "Wild4"]:
              self.fill_color = "#222"
+        self.hovered = False
         self.draw_card()
-        if state == "normal":
-            self.bind("<Button-1>", self.on_click)
-            self.bind("<Enter>", self.on_hover)
-            self.bind("<Leave>", self.on_leave)
+        self.bind("<Button-1>", self.on_click)
+        self.bind("<Enter>", self.on_hover)
+        self.bind("<Leave>", self.on_leave)
 
     def draw_card(self):
-        pad = 2
-        self.create_rectangle(pad+3, pad+3, self.width-pad, self.height-pad, fill="white", outline="black", width=1)
-        self.create_rectangle(pad+6, pad+6, self.width-pad-3, self.height-pad-3, fill=self.fill_color, outline="")
-        oval_pad_x, oval_pad_y = 10, 25
-        self.create_oval(oval_pad_x, oval_pad_y, self.width-oval_pad_x, self.height-oval_pad_y, fill="white", outline=self.fill_color)
+        # Card body is one cached image; Tk can't rasterise text, so the glyphs stay text items
+        self.sprite = SPRITES.get(('card', self.fill_color, self.width, self.height),
+                                  lambda: render_card_face(self, self.fill_color, self.width, self.height))
+        self.create_image(0, 0, image=self.sprite, anchor="nw")
         symbols = {'Skip': '⊘', 'Reverse': '⇄', 'Draw2': '+2', 'Wild': '🌈', 'Wild4': '+4'}
         text = symbols.get(self.card.value, self.card.value)
         txt_col = self.fill_color
@@ -332,12 +124,25 @@ class ModernCard(tk.Canvas):
         self.create_text(12, 12, text=text, fill="white", font=corner_font)
         self.create_text(self.width-12, self.height-12, text=text, fill="white", font=corner_font)
 
+    def set_state(self, state, bg=COLORS['BG']):
+        # Enable or disable in place instead of rebuilding the card
+        if state == self.state: return
+        if self.hovered:
+            self.move(tk.ALL, 0, 5)
+            self.hovered = False
+        self.state = state
+        self.config(bg=bg)
+
     def on_click(self, event):
         if self.command and self.state == "normal": self.command()
     def on_hover(self, event):
-        if self.state == "normal": self.move(tk.ALL, 0, -5)
+        if self.state == "normal" and not self.hovered:
+            self.move(tk.ALL, 0, -5)
+            self.hovered = True
     def on_leave(self, event):
-        if self.state == "normal": self.move(tk.ALL, 0, 5)
+        if self.hovered:
+            self.move(tk.ALL, 0, 5)
+            self.hovered = False
 
 class ColorChooser(tk.Toplevel):
     def __init__(self, parent):
@@ -358,6 +163,233 @@ class ColorChooser(tk.Toplevel):
         self.chosen_color = color
         self.destroy()
 
+# REPLAY SCRUBBER
+SCRUB_MS = 40
+
+class ReplayViewer(tk.Toplevel):
+    # Drags on the slider only reschedule one redraw; each redraw rebuilds the
+    # table from the game's nearest keyframe, never from turn 0
+    def __init__(self, parent, archive, game=0):
+        super().__init__(parent)
+        self.archive = archive
+        self.title(f"Replay - {archive.path}")
+        self.geometry("900x520")
+        self.configure(bg=COLORS['BG'])
+        self.record = None
+        self.pending = None
+        self.widgets = []
+
+        bar = tk.Frame(self, bg=COLORS['Sidebar'], pady=6)
+        bar.pack(fill="x")
+        tk.Label(bar, text="Game", fg="white", bg=COLORS['Sidebar']).pack(side="left", padx=(10, 4))
+        self.game_var = tk.StringVar(value=str(game))
+        entry = tk.Entry(bar, textvariable=self.game_var, width=10)
+        entry.pack(side="left")
+        entry.bind("<Return>", lambda e: self.load_game())
+        tk.Label(bar, text=f"of {len(archive):,}", fg="#aaa", bg=COLORS['Sidebar']).pack(side="left", padx=4)
+        self.scale = tk.Scale(bar, from_=0, to=0, orient="horizontal", length=500, showvalue=True,
+                              command=self.on_scrub, bg=COLORS['Sidebar'], fg="white", highlightthickness=0)
+        self.scale.pack(side="left", fill="x", expand=True, padx=10)
+        self.status = tk.Label(self, text="", font=("Arial", 11, "bold"), fg="white", bg=COLORS['BG'], anchor="w")
+        self.status.pack(fill="x", padx=10, pady=6)
+        self.table = tk.Frame(self, bg=COLORS['BG'])
+        self.table.pack(fill="both", expand=True, padx=10)
+        self.bind("<Left>", lambda e: self.step(-1))
+        self.bind("<Right>", lambda e: self.step(1))
+        self.load_game()
+
+    def load_game(self):
+        try:
+            self.record = self.archive.game(int(self.game_var.get()))
+        except (ValueError, IndexError) as e:
+            self.status.config(text=str(e))
+            return
+        self.scale.config(to=self.record.turns)
+        self.scale.set(0)
+        self.schedule()
+
+    def step(self, delta):
+        self.scale.set(self.scale.get() + delta)
+
+    def on_scrub(self, value):
+        self.schedule()
+
+    def schedule(self):
+        if self.pending is None:
+            self.pending = self.after(SCRUB_MS, self.show_turn)
+
+    def show_turn(self):
+        self.pending = None
+        if self.record is None: return
+        engine = self.record.engine_at(self.scale.get(), record_events=False)
+        for w in self.widgets: w.destroy()
+        self.widgets = []
+        current = engine.get_current_player()
+        direction = "clockwise" if engine.direction == 1 else "anticlockwise"
+        self.status.config(text=f"Turn {engine.turn} of {self.record.turns}: {current.name} to move, "
+                                f"{COLOR_NAMES[engine.current_color]}, {direction}, deck {engine.deck.size()}")
+        if not engine.discard.is_empty():
+            top = engine.discard.peek()
+            declared = COLOR_NAMES[engine.current_color] if top.color_id == BLACK else None
+            card = ModernCard(self.table, top, width=70, height=100, state="disabled", color=declared)
+            card.grid(row=0, column=0, rowspan=max(len(engine.seats), 1), padx=(0, 20), sticky="n")
+            self.widgets.append(card)
+        for row, player in enumerate(engine.seats):
+            fg = "yellow" if player is current else "white"
+            label = tk.Label(self.table, text=f"{player.name} ({len(player.hand)})", width=12, anchor="w",
+                             font=("Arial", 10, "bold"), fg=fg, bg=COLORS['BG'])
+            label.grid(row=row, column=1, sticky="w")
+            hand = tk.Frame(self.table, bg=COLORS['BG'])
+            hand.grid(row=row, column=2, sticky="w", pady=2)
+            for card in player.hand:
+                ModernCard(hand, card, width=36, height=54, state="disabled").pack(side="left", padx=1)
+            self.widgets.extend((label, hand))
+
+# ANIMATION
+def ease_in_out(t):
+    return t * t * (3 - 2 * t)
+
+class Tween:
+    def __init__(self, duration_ms, update, easing):
+        self.duration = duration_ms / 1000
+        self.update = update
+        self.easing = easing
+        self.start = time.perf_counter()
+        self.done = False
+        self.callbacks = []
+
+    def add_done_callback(self, fn):
+        if self.done: fn()
+        else: self.callbacks.append(fn)
+
+class Animator:
+    # One after() loop advances every active tween from the wall clock, so a
+    # slow frame skips ahead instead of stretching the animation
+    def __init__(self, root, fps=60):
+        self.root = root
+        self.frame_ms = max(1, int(1000 / fps))
+        self.tweens = []
+        self.after_id = None
+
+    def add(self, duration_ms, update, on_complete=None, easing=ease_in_out):
+        tween = Tween(duration_ms, update, easing)
+        if on_complete: tween.add_done_callback(on_complete)
+        update(0.0)
+        self.tweens.append(tween)
+        if self.after_id is None:
+            self.after_id = self.root.after(self.frame_ms, self.tick)
+        return tween
+
+    def tick(self):
+        self.after_id = None
+        now = time.perf_counter()
+        finished = []
+        for tween in self.tweens:
+            t = min(1.0, (now - tween.start) / tween.duration) if tween.duration > 0 else 1.0
+            tween.update(tween.easing(t))
+            if t >= 1.0: finished.append(tween)
+        for tween in finished:
+            self.tweens.remove(tween)
+        if self.tweens:
+            self.after_id = self.root.after(self.frame_ms, self.tick)
+        for tween in finished:
+            tween.done = True
+            for fn in tween.callbacks: fn()
+
+    def cancel_all(self):
+        # Drops running tweens without firing their callbacks
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.tweens = []
+
+class ParticleSystem:
+    # Fixed pool of canvas rectangles driven by one after() loop
+    def __init__(self, root, canvas, cap=150, fps=30, spawn_per_sec=10, speed=100, rng=None):
+        self.root = root
+        self.canvas = canvas
+        self.rng = rng or random.Random()
+        self.frame_ms = max(1, int(1000 / fps))
+        self.spawn_per_sec = spawn_per_sec
+        self.speed = speed
+        self.free = [canvas.create_rectangle(0, 0, 0, 0, outline="", state="hidden", tags="particle")
+                     for _ in range(cap)]
+        self.live = []
+        self.spawn_debt = 0.0
+        self.last = None
+        self.after_id = None
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.after_id = self.root.after(self.frame_ms, self.tick)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        now = time.perf_counter()
+        dt = now - self.last
+        self.last = now
+
+        # Every live particle rises at the same speed: one move for all of them
+        if self.live:
+            dy = -self.speed * dt
+            self.canvas.move("live", 0, dy)
+            still = []
+            for particle in self.live:
+                particle[1] += dy
+                if particle[1] > -20:
+                    still.append(particle)
+                else:
+                    self.recycle(particle[0])
+            self.live = still
+
+        self.spawn_debt += self.spawn_per_sec * dt
+        while self.spawn_debt >= 1 and self.free:
+            self.spawn_debt -= 1
+            self.spawn()
+        self.spawn_debt = min(self.spawn_debt, 1)
+        self.after_id = self.root.after(self.frame_ms, self.tick)
+
+    def spawn(self):
+        w, h = self.root.winfo_width(), self.root.winfo_height()
+        item = self.free.pop()
+        x = self.rng.randint(0, w)
+        y = h + 10
+        size = self.rng.randint(5, 15)
+        self.canvas.coords(item, x, y, x+size, y+size)
+        self.canvas.itemconfigure(item, fill=self.rng.choice(["white", "yellow", "cyan"]), state="normal")
+        self.canvas.addtag_withtag("live", item)
+        self.live.append([item, y])
+
+    def recycle(self, item):
+        self.canvas.itemconfigure(item, state="hidden")
+        self.canvas.dtag(item, "live")
+        self.free.append(item)
+
+# AI WORKER
+AI_DELAY_MS = 1200
+AI_POLL_MS = 16
+
+def think(snapshot, open_hand, strategies):
+    # Runs in the AI pool on a private copy of the table, so the Tk thread
+    # can keep redrawing (and re-sorting the human hand) while bots search.
+    # restore() seats plain players, so each seat's strategy is put back here.
+    engine = UnoEngine(record_events=False)
+    engine.restore(snapshot)
+    engine.open_hand = open_hand
+    for player, strategy in zip(engine.seats, strategies):
+        player.strategy = strategy
+        if hasattr(strategy, 'follow_copy'): strategy.follow_copy(engine, player)
+    return engine.get_ai_move()
+
+FLY_MS = 300
+RESIZE_MS = 16
+GUI_HOOKS = ('update_ui', 'update_opponents', 'update_discard', 'update_hand', 'run_ai', 'apply_ai_move',
+             'finish_play', 'finish_draw', 'draw_menu_content', 'draw_win_screen_content')
+
 class UnoGUI:
     def __init__(self, root):
         self.root = root
@@ -368,19 +400,58 @@ class UnoGUI:
         self.animating = False
         self.player_card_widgets = []
         self.opponent_widgets = {} 
+        self.ui_stats = {'calls': 0, 'total_ms': 0.0, 'last_ms': 0.0, 'created': 0, 'destroyed': 0}
+        self.animator = Animator(self.root)
+        # Decoration randomness stays off the game's RNG
+        self.fx_rng = random.Random()
+        self.particles = None
+        self.particle_cap = 150
+        self.particle_fps = 30
+        self.sort_choice = 'color'
+        self.profiler = None
+        self.profiler_overlay = None
+        self.trace_path = "uno_trace.json"
+        # Bot turns: one pending after() or search at a time; results come back
+        # through ai_results tagged with the ticket they were asked under
+        self.ai_processes = False
+        self.ai_pool = None
+        self.ai_results = queue.Queue()
+        self.ai_ticket = 0
+        self.ai_after = None
+        self.ai_future = None
+        self.ai_poll = None
+        # Menu and win screen items are built once per screen and moved on resize
+        self.resize_to = None
+        self.resize_after = None
+        self.layout_size = None
         
         self.root.bind("<Configure>", self.on_window_resize)
         self.show_start_menu()
 
     def on_window_resize(self, event):
+        # The root's binding also sees every child widget's <Configure>; only the
+        # root's own size counts, and a drag's burst becomes one layout per frame
+        if event.widget is not self.root: return
+        self.resize_to = (event.width, event.height)
+        if self.resize_after is None:
+            self.resize_after = self.root.after(RESIZE_MS, self.apply_resize)
+
+    def apply_resize(self):
+        self.resize_after = None
         if self.state == "MENU":
-            self.draw_menu_content(event.width, event.height)
+            self.draw_menu_content(*self.resize_to)
         elif self.state == "WIN":
-            self.draw_win_screen_content(event.width, event.height)
+            self.draw_win_screen_content(*self.resize_to)
 
     # START MENU (WITH HOVER)
     def show_start_menu(self):
         self.state = "MENU"
+        self.cancel_ai()
+        self.animator.cancel_all()
+        self.animating = False
+        if self.particles:
+            self.particles.stop()
+            self.particles = None
         self.root.update_idletasks() 
         for widget in self.root.winfo_children(): widget.destroy()
         
@@ -388,6 +459,7 @@ class UnoGUI:
         self.menu_canvas = tk.Canvas(self.root, bg=COLORS['MenuBG'], highlightthickness=0)
         self.menu_canvas.pack(fill="both", expand=True)
         
+        self.build_menu()
         self.draw_menu_content(self.root.winfo_width(), self.root.winfo_height())
         
         # Bind hover and click for the Play Button
@@ -395,49 +467,65 @@ class UnoGUI:
         self.menu_canvas.tag_bind("play_btn", "<Enter>", self.on_play_hover)
         self.menu_canvas.tag_bind("play_btn", "<Leave>", self.on_play_leave)
 
-    def draw_menu_content(self, w, h):
-        if w < 100 or h < 100: return
-        self.menu_canvas.delete("all")
-        cx, cy = w / 2, h / 2
+    def build_menu(self):
+        # Every item is created once, laid out around the canvas origin;
+        # draw_menu_content only moves them, so resizing never adds items
+        canvas = self.menu_canvas
+        self.menu_sprites = []
+        self.menu_centre = (0, 0)
+        self.layout_size = None
 
         # Clouds
-        for i in range(6):
-            x = (i * 200) % w
-            y = (i * 70 + 50) % (h // 2)
-            self.menu_canvas.create_oval(x, y, x+150, y+60, fill="white", outline="")
-            self.menu_canvas.create_oval(x+50, y-20, x+200, y+50, fill="white", outline="")
+        self.menu_clouds = [(canvas.create_oval(0, 0, 0, 0, fill="white", outline=""),
+                             canvas.create_oval(0, 0, 0, 0, fill="white", outline="")) for _ in range(6)]
 
         # Decoration Cards
-        self.draw_pixel_card(self.menu_canvas, cx - 350, cy, COLORS['Red'], "1")
-        self.draw_pixel_card(self.menu_canvas, cx - 250, cy - 100, COLORS['Yellow'], "⇄", small=True)
-        self.draw_pixel_card(self.menu_canvas, cx + 250, cy, COLORS['Blue'], "+2")
-        self.draw_pixel_card(self.menu_canvas, cx + 180, cy - 120, COLORS['Green'], "⊘", small=True)
+        self.draw_pixel_card(canvas, -350, 0, COLORS['Red'], "1")
+        self.draw_pixel_card(canvas, -250, -100, COLORS['Yellow'], "⇄", small=True)
+        self.draw_pixel_card(canvas, 250, 0, COLORS['Blue'], "+2")
+        self.draw_pixel_card(canvas, 180, -120, COLORS['Green'], "⊘", small=True)
 
         # Title
         title_text = "PIXEL UNO"
-        self.menu_canvas.create_text(cx+5, cy - 150, text=title_text, font=("Courier New", 60, "bold"), fill="#C0C0C0")
-        self.menu_canvas.create_text(cx, cy - 155, text=title_text, font=("Courier New", 60, "bold"), fill="#FFD700")
+        canvas.create_text(5, -150, text=title_text, font=("Courier New", 60, "bold"), fill="#C0C0C0", tags="centred")
+        canvas.create_text(0, -155, text=title_text, font=("Courier New", 60, "bold"), fill="#FFD700", tags="centred")
 
         # Stone Play Button 
         btn_w, btn_h = 240, 80
-        self.btn_x1, self.btn_y1 = cx - btn_w/2, cy + 50
-        self.btn_x2, self.btn_y2 = cx + btn_w/2, cy + 50 + btn_h
+        self.btn_x1, self.btn_y1 = -btn_w/2, 50
+        self.btn_x2, self.btn_y2 = btn_w/2, 50 + btn_h
 
         # Shadow
-        self.menu_canvas.create_rectangle(self.btn_x1+6, self.btn_y1+6, self.btn_x2+6, self.btn_y2+6, fill="#222", outline="")
+        canvas.create_rectangle(self.btn_x1+6, self.btn_y1+6, self.btn_x2+6, self.btn_y2+6, fill="#222", outline="", tags="centred")
         # Border
-        self.menu_canvas.create_rectangle(self.btn_x1, self.btn_y1, self.btn_x2, self.btn_y2, fill="#EEE", outline="#555", width=4)
+        canvas.create_rectangle(self.btn_x1, self.btn_y1, self.btn_x2, self.btn_y2, fill="#EEE", outline="#555", width=4, tags="centred")
         
         # Inner Body (Tagged for hover)
-        self.menu_canvas.create_rectangle(self.btn_x1+6, self.btn_y1+6, self.btn_x2-6, self.btn_y2-6, fill="#DDD", outline="", tags=("play_btn", "play_body"))
+        canvas.create_rectangle(self.btn_x1+6, self.btn_y1+6, self.btn_x2-6, self.btn_y2-6, fill="#DDD", outline="", tags=("centred", "play_btn", "play_body"))
         
         # Bolts
         for bx, by in [(self.btn_x1+10, self.btn_y1+10), (self.btn_x2-10, self.btn_y1+10), 
                        (self.btn_x1+10, self.btn_y2-10), (self.btn_x2-10, self.btn_y2-10)]:
-             self.menu_canvas.create_oval(bx-3, by-3, bx+3, by+3, fill="#888", outline="#555")
+             canvas.create_oval(bx-3, by-3, bx+3, by+3, fill="#888", outline="#555", tags="centred")
         
         # Text (Tagged for hover)
-        self.menu_canvas.create_text(cx, cy + 50 + btn_h/2, text="PLAY", font=("Impact", 32), fill="#333", tags=("play_btn", "play_text"))
+        canvas.create_text(0, 50 + btn_h/2, text="PLAY", font=("Impact", 32), fill="#333", tags=("centred", "play_btn", "play_text"))
+
+    def draw_menu_content(self, w, h):
+        if w < 100 or h < 100 or (w, h) == self.layout_size: return
+        self.layout_size = (w, h)
+        canvas = self.menu_canvas
+        for i, (left, right) in enumerate(self.menu_clouds):
+            x = (i * 200) % w
+            y = (i * 70 + 50) % (h // 2)
+            canvas.coords(left, x, y, x+150, y+60)
+            canvas.coords(right, x+50, y-20, x+200, y+50)
+
+        cx, cy = w / 2, h / 2
+        dx, dy = cx - self.menu_centre[0], cy - self.menu_centre[1]
+        canvas.move("centred", dx, dy)
+        self.menu_centre = (cx, cy)
+        self.btn_x1, self.btn_y1, self.btn_x2, self.btn_y2 = self.btn_x1+dx, self.btn_y1+dy, self.btn_x2+dx, self.btn_y2+dy
 
     def on_play_hover(self, event):
         # Light up the button
@@ -452,12 +540,11 @@ class UnoGUI:
     def draw_pixel_card(self, canvas, x, y, color, text, small=False):
         w, h = (60, 90) if small else (100, 150)
         x1, y1 = x - w/2, y - h/2
-        x2, y2 = x + w/2, y + h/2
-        canvas.create_rectangle(x1, y1, x2, y2, fill="white", outline="black", width=2)
-        canvas.create_rectangle(x1+5, y1+5, x2-5, y2-5, fill=color, outline="")
-        canvas.create_oval(x1+10, y1+h/4, x2-10, y1+h*3/4, fill="white", outline=color)
+        sprite = SPRITES.get(('pixel', color, w, h), lambda: render_pixel_card(canvas, color, w, h))
+        self.menu_sprites.append(sprite)
+        canvas.create_image(x1-1, y1-1, image=sprite, anchor="nw", tags="centred")
         font_size = 20 if small else 40
-        canvas.create_text(x, y, text=text, fill=color, font=("Courier New", font_size, "bold"))
+        canvas.create_text(x, y, text=text, fill=color, font=("Courier New", font_size, "bold"), tags="centred")
 
     def check_menu_click(self, event):
         # We can just start game because the tag_bind handles collision detection for us
@@ -466,9 +553,11 @@ class UnoGUI:
     # GAME SETUP & SIDEBAR MENU
     def start_game(self):
         self.state = "GAME"
+        self.cancel_ai()
         for widget in self.root.winfo_children(): widget.destroy()
         self.root.configure(bg=COLORS['BG'])
         self.engine = UnoEngine()
+        if self.profiler: self.profiler.instrument(self.engine, ENGINE_HOOKS)
         self.engine.initialize_game()
         self.setup_game_layout()
         self.update_ui()
@@ -481,16 +570,20 @@ class UnoGUI:
         self.log_container = tk.Frame(self.sidebar, bg=COLORS['Sidebar'])
         self.log_container.pack(fill="both", expand=True, padx=10)
         self.log_labels = []
+        self.log_texts = []
         for _ in range(8):
             lbl = tk.Label(self.log_container, text="", fg="#aaa", bg=COLORS['Sidebar'], font=("Consolas", 10), anchor="w")
             lbl.pack(fill="x", pady=2)
             self.log_labels.append(lbl)
+            self.log_texts.append("")
         
         # Controls Section
         tk.Label(self.sidebar, text="CONTROLS", fg="white", bg=COLORS['Sidebar'], font=("Segoe UI", 12, "bold")).pack(pady=10)
         btn_style = {"bg": "#444", "fg": "white", "relief": "flat", "font": ("Segoe UI", 10)}
         tk.Button(self.sidebar, text="Sort by Color", command=lambda: self.sort_hand('color'), **btn_style).pack(fill="x", padx=20, pady=5)
         tk.Button(self.sidebar, text="Sort by Value", command=lambda: self.sort_hand('value'), **btn_style).pack(fill="x", padx=20, pady=5)
+        self.keep_sorted_btn = tk.Button(self.sidebar, text="Keep Sorted: Off", command=self.toggle_keep_sorted, **btn_style)
+        self.keep_sorted_btn.pack(fill="x", padx=20, pady=5)
 
         # SYSTEM SECTION (New)
         tk.Label(self.sidebar, text="\nSYSTEM", fg="#888", bg=COLORS['Sidebar'], font=("Segoe UI", 10, "bold")).pack(pady=5)
@@ -522,6 +615,8 @@ class UnoGUI:
 
         self.discard_container = tk.Frame(self.center_frame, bg=COLORS['BG'])
         self.discard_container.pack(side="left", padx=20)
+        self.discard_widget = None
+        self.discard_key = None
 
         self.info_lbl = tk.Label(self.game_area, text="", font=("Impact", 24), bg=COLORS['BG'], fg="white")
         self.info_lbl.place(relx=0.5, rely=0.65, anchor="center")
@@ -533,6 +628,11 @@ class UnoGUI:
         self.cards_frame = tk.Frame(self.hand_area, bg="#206030")
         self.cards_frame.pack(expand=True)
 
+        # Widgets kept between update_ui calls
+        self.player_card_widgets = []
+        self.opponent_widgets = {}
+        self.opponent_views = {}
+
     def render_deck_visual(self, is_hovered):
         self.draw_pile.delete("all")
         base_x, base_y = 15, 20
@@ -555,9 +655,13 @@ class UnoGUI:
                 self.draw_pile.create_text(x+45, y+65, text="UNO", fill="yellow", font=("Arial Black", 14, "italic"))
 
     def update_ui(self):
+        started = time.perf_counter()
         logs = self.engine.logs.get_all()
         for i, lbl in enumerate(self.log_labels):
-            lbl.config(text=f"> {logs[i]}" if i < len(logs) else "")
+            text = f"> {logs[i]}" if i < len(logs) else ""
+            if text != self.log_texts[i]:
+                lbl.config(text=text)
+                self.log_texts[i] = text
 
         curr_p = self.engine.get_current_player()
         arrow = "➜" if self.engine.direction == 1 else "⬅"
@@ -568,121 +672,194 @@ class UnoGUI:
 
         self.deck_count_lbl.config(text=f"Cards: {self.engine.deck.size()}")
 
-        for widget in self.opponents_frame.winfo_children(): widget.destroy()
-        self.opponent_widgets = {}
-        temp = self.engine.players.head
-        for _ in range(self.engine.players.size):
-            p = temp.data
-            if p.name != "You":
-                f = tk.Frame(self.opponents_frame, bg=COLORS['BG'], padx=30)
-                f.pack(side="left")
-                self.opponent_widgets[p.name] = f
-                canv = tk.Canvas(f, width=40, height=50, bg=COLORS['BG'], highlightthickness=0)
-                canv.pack()
-                for i in range(3):
-                    o = i * 2
-                    canv.create_rectangle(5+o, 5-o, 35+o, 45-o, fill="#333", outline="white")
-                tk.Label(f, text=p.name, font=("Arial", 11, "bold"), bg=COLORS['BG'], fg="yellow" if p == curr_p else "white").pack()
-                tk.Label(f, text=f"{len(p.hand)} Cards", font=("Arial", 9), bg=COLORS['BG'], fg="#ddd").pack()
-            temp = temp.next
-
-        for widget in self.discard_container.winfo_children(): widget.destroy()
-        if not self.engine.discard.is_empty():
-            ModernCard(self.discard_container, self.engine.discard.peek(), width=100, height=140, state="disabled").pack()
+        self.update_opponents(curr_p)
+        self.update_discard()
 
-        for widget in self.cards_frame.winfo_children(): widget.destroy()
-        self.player_card_widgets = []
-        human = None
-        t = self.engine.players.head
-        for _ in range(3): 
-            if t.data.name == "You": human = t.data
-            t = t.next
+        human = self.engine.players.find("You")
         if human:
-            is_turn = (curr_p == human)
-            for i, card in enumerate(human.hand):
-                state = "normal" if is_turn and self.engine.check_playable(card) and not self.animating else "disabled"
-                mc = ModernCard(self.cards_frame, card, command=lambda idx=i: self.on_card_click(idx), state=state)
-                mc.pack(side="left", padx=5)
-                self.player_card_widgets.append(mc)
-                if state == "disabled": mc.config(bg="#154020")
+            self.update_hand(human, curr_p == human)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.ui_stats['calls'] += 1
+        self.ui_stats['total_ms'] += elapsed
+        self.ui_stats['last_ms'] = elapsed
+        if self.profiler: self.profiler.frame(self.ui_stats)
 
         if self.engine.game_over:
             self.show_win_screen()
         elif curr_p.is_ai and not self.animating:
-            self.root.after(1200, self.run_ai)
+            self.schedule_ai()
+
+    def update_opponents(self, curr_p):
+        seen = set()
+        temp = self.engine.players.head
+        for _ in range(self.engine.players.size):
+            p = temp.data
+            if p.name != "You":
+                seen.add(p.name)
+                view = self.opponent_views.get(p.name)
+                if view is None:
+                    view = self.create_opponent_view(p)
+                name_fg = "yellow" if p == curr_p else "white"
+                if view['name_fg'] != name_fg:
+                    view['name'].config(fg=name_fg)
+                    view['name_fg'] = name_fg
+                count_text = f"{len(p.hand)} Cards"
+                if view['count_text'] != count_text:
+                    view['count'].config(text=count_text)
+                    view['count_text'] = count_text
+            temp = temp.next
+
+        for name in [n for n in self.opponent_views if n not in seen]:
+            self.opponent_views.pop(name)['frame'].destroy()
+            del self.opponent_widgets[name]
+            self.ui_stats['destroyed'] += 1
+
+    def create_opponent_view(self, p):
+        f = tk.Frame(self.opponents_frame, bg=COLORS['BG'], padx=30)
+        f.pack(side="left")
+        canv = tk.Canvas(f, width=40, height=50, bg=COLORS['BG'], highlightthickness=0)
+        canv.pack()
+        for i in range(3):
+            o = i * 2
+            canv.create_rectangle(5+o, 5-o, 35+o, 45-o, fill="#333", outline="white")
+        name_lbl = tk.Label(f, text=p.name, font=("Arial", 11, "bold"), bg=COLORS['BG'], fg="white")
+        name_lbl.pack()
+        count_lbl = tk.Label(f, text="", font=("Arial", 9), bg=COLORS['BG'], fg="#ddd")
+        count_lbl.pack()
+        view = {'frame': f, 'name': name_lbl, 'count': count_lbl, 'name_fg': "white", 'count_text': ""}
+        self.opponent_views[p.name] = view
+        self.opponent_widgets[p.name] = f
+        self.ui_stats['created'] += 1
+        return view
+
+    def update_discard(self):
+        if self.engine.discard.is_empty():
+            key = None
+        else:
+            top = self.engine.discard.peek()
+            key = (top, self.engine.current_color if top.color_id == BLACK else None)
+        if key == self.discard_key: return
+        if self.discard_widget is not None:
+            self.discard_widget.destroy()
+            self.discard_widget = None
+            self.ui_stats['destroyed'] += 1
+        if key is not None:
+            declared = COLOR_NAMES[key[1]] if key[1] is not None else None
+            self.discard_widget = ModernCard(self.discard_container, key[0], width=100, height=140, state="disabled", color=declared)
+            self.discard_widget.pack()
+            self.ui_stats['created'] += 1
+        self.discard_key = key
+
+    def update_hand(self, human, is_turn):
+        playable = set(self.engine.playable_indices(human)) if is_turn and not self.animating else ()
+        previous = self.player_card_widgets
+        reusable = {w.card: w for w in previous}
+        widgets = []
+        for i, card in enumerate(human.hand):
+            state = "normal" if i in playable else "disabled"
+            bg = COLORS['BG'] if state == "normal" else "#154020"
+            mc = reusable.pop(card, None)
+            if mc is None:
+                mc = ModernCard(self.cards_frame, card, state=state)
+                if state == "disabled": mc.config(bg=bg)
+                self.ui_stats['created'] += 1
+            else:
+                mc.set_state(state, bg)
+            mc.command = lambda idx=i: self.on_card_click(idx)
+            widgets.append(mc)
+
+        removed = set(reusable.values())
+        for mc in removed:
+            mc.destroy()
+            self.ui_stats['destroyed'] += 1
+
+        # New cards are appended by pack, anything else needs a full repack
+        kept = [w for w in previous if w not in removed]
+        if widgets[:len(kept)] == kept:
+            to_pack = widgets[len(kept):]
+        else:
+            for mc in kept: mc.pack_forget()
+            to_pack = widgets
+        for mc in to_pack:
+            mc.pack(side="left", padx=5)
+        self.player_card_widgets = widgets
 
     # WIN SCREEN (PIXELATED FONT)
     def show_win_screen(self):
         self.state = "WIN"
+        self.cancel_ai()
         self.root.update_idletasks()
         self.win_canvas = tk.Canvas(self.root, highlightthickness=0)
         self.win_canvas.place(x=0, y=0, relwidth=1, relheight=1)
+        self.build_win_screen()
         self.draw_win_screen_content(self.root.winfo_width(), self.root.winfo_height())
         self.win_canvas.bind("<Button-1>", self.check_win_click)
-        self.animate_win_particles()
+        self.particles = ParticleSystem(self.root, self.win_canvas, self.particle_cap, self.particle_fps, rng=self.fx_rng)
+        self.particles.start()
 
-    def draw_win_screen_content(self, w, h):
-        self.win_canvas.delete("content")
+    def build_win_screen(self):
+        # Same scheme as the menu: items made once, then moved by draw_win_screen_content
+        canvas = self.win_canvas
         winner_name = self.engine.winner.name
         is_me = (winner_name == "You")
+        self.win_centre = (0, 0)
+        self.layout_size = None
         
         sky_color = "#1a0b2e" if is_me else "#2c0505"
-        self.win_canvas.configure(bg=sky_color)
+        canvas.configure(bg=sky_color)
         
-        # Mountains
-        self.draw_mountains(self.win_canvas, w, h, base_height=h-100, peak_height=200, color="#111", jaggedness=50)
+        # Mountains: back to front, each sitting this far above the bottom edge
         mid_col = "#4b2e83" if is_me else "#500"
-        self.draw_mountains(self.win_canvas, w, h, base_height=h-50, peak_height=120, color=mid_col, jaggedness=30)
-        self.draw_mountains(self.win_canvas, w, h, base_height=h, peak_height=40, color="#222", jaggedness=10)
+        self.ridges = [(self.new_ridge(canvas, 200, "#111"), 100),
+                       (self.new_ridge(canvas, 120, mid_col), 50),
+                       (self.new_ridge(canvas, 40, "#222"), 0)]
 
-        cx, cy = w / 2, h / 2 - 50
         text_main = "YOU WIN!" if is_me else "ELIMINATED"
         text_sub = f"{winner_name} won the game!" if not is_me else "Victory is yours!"
         
         # PIXELATED FONT: Courier New
-        self.win_canvas.create_text(cx+5, cy, text=text_main, font=("Courier New", 70, "bold"), fill="black", tags="content")
-        self.win_canvas.create_text(cx, cy, text=text_main, font=("Courier New", 70, "bold"), fill="white", tags="content")
-        self.win_canvas.create_text(cx, cy+120, text=text_sub, font=("Courier New", 20, "bold"), fill="white", tags="content")
+        canvas.create_text(5, 0, text=text_main, font=("Courier New", 70, "bold"), fill="black", tags="content")
+        canvas.create_text(0, 0, text=text_main, font=("Courier New", 70, "bold"), fill="white", tags="content")
+        canvas.create_text(0, 120, text=text_sub, font=("Courier New", 20, "bold"), fill="white", tags="content")
 
         btn_w, btn_h = 250, 60
-        self.ret_x1, self.ret_y1 = cx - btn_w/2, cy + 200
-        self.ret_x2, self.ret_y2 = cx + btn_w/2, cy + 200 + btn_h
+        self.ret_x1, self.ret_y1 = -btn_w/2, 200
+        self.ret_x2, self.ret_y2 = btn_w/2, 200 + btn_h
         
-        self.win_canvas.create_rectangle(self.ret_x1+5, self.ret_y1+5, self.ret_x2+5, self.ret_y2+5, fill="black", outline="", tags="content")
-        self.win_canvas.create_rectangle(self.ret_x1, self.ret_y1, self.ret_x2, self.ret_y2, fill="#333", outline="white", width=3, tags="content")
-        self.win_canvas.create_text(cx, self.ret_y1 + btn_h/2, text="RETURN TO MENU", font=("Courier New", 18, "bold"), fill="white", tags="content")
+        canvas.create_rectangle(self.ret_x1+5, self.ret_y1+5, self.ret_x2+5, self.ret_y2+5, fill="black", outline="", tags="content")
+        canvas.create_rectangle(self.ret_x1, self.ret_y1, self.ret_x2, self.ret_y2, fill="#333", outline="white", width=3, tags="content")
+        canvas.create_text(0, self.ret_y1 + btn_h/2, text="RETURN TO MENU", font=("Courier New", 18, "bold"), fill="white", tags="content")
+
+    def draw_win_screen_content(self, w, h):
+        if (w, h) == self.layout_size: return
+        self.layout_size = (w, h)
+        for ridge, rise in self.ridges:
+            self.draw_mountains(self.win_canvas, ridge, w, h, h - rise)
 
-    def draw_mountains(self, canvas, w, h, base_height, peak_height, color, jaggedness):
+        cx, cy = w / 2, h / 2 - 50
+        dx, dy = cx - self.win_centre[0], cy - self.win_centre[1]
+        self.win_canvas.move("content", dx, dy)
+        self.win_centre = (cx, cy)
+        self.ret_x1, self.ret_y1, self.ret_x2, self.ret_y2 = self.ret_x1+dx, self.ret_y1+dy, self.ret_x2+dx, self.ret_y2+dy
+
+    def new_ridge(self, canvas, peak_height, color):
+        item = canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=color, outline="", tags="mountain")
+        return {'item': item, 'peak': peak_height, 'xs': [], 'ys': []}
+
+    def draw_mountains(self, canvas, ridge, w, h, base_height):
+        # The profile is drawn from fx_rng once and only extended when the window
+        # gets wider than before, so resizing moves the terrain but never reshapes it
+        xs, ys = ridge['xs'], ridge['ys']
+        while not xs or xs[-1] < w:
+            xs.append((xs[-1] if xs else 0) + self.fx_rng.randint(30, 100))
+            ys.append(self.fx_rng.randint(-ridge['peak'], 0))
         points = [0, h, 0, base_height]
-        curr_x = 0
-        while curr_x < w:
-            step = random.randint(30, 100)
-            curr_x += step
-            y_var = random.randint(-peak_height, 0)
-            points.append(curr_x)
-            points.append(base_height + y_var)
+        for x, y in zip(xs, ys):
+            points.extend((x, base_height + y))
+            if x >= w: break
         points.extend([w, h, 0, h])
-        canvas.create_polygon(points, fill=color, outline="", tags="mountain")
-
-    def animate_win_particles(self):
-        if self.state != "WIN": return
-        w, h = self.root.winfo_width(), self.root.winfo_height()
-        x = random.randint(0, w)
-        y = h + 10
-        size = random.randint(5, 15)
-        color = random.choice(["white", "yellow", "cyan"])
-        pid = self.win_canvas.create_rectangle(x, y, x+size, y+size, fill=color, outline="", tags="particle")
-        self.move_particle(pid)
-        self.root.after(100, self.animate_win_particles)
-
-    def move_particle(self, pid):
-        if self.state != "WIN": return
-        self.win_canvas.move(pid, 0, -5)
-        coords = self.win_canvas.coords(pid)
-        if coords and coords[1] > -20:
-            self.root.after(50, lambda: self.move_particle(pid))
-        else:
-            self.win_canvas.delete(pid)
+        canvas.coords(ridge['item'], points)
 
     def check_win_click(self, event):
         if self.ret_x1 <= event.x <= self.ret_x2 and self.ret_y1 <= event.y <= self.ret_y2:
@@ -695,7 +872,7 @@ class UnoGUI:
         if human.name != "You": return
         card = human.hand[idx]
         chosen_color = None
-        if card.color == 'Black':
+        if card.color_id == BLACK:
             chooser = ColorChooser(self.root)
             if not chooser.chosen_color: return 
             chosen_color = chooser.chosen_color
@@ -730,9 +907,78 @@ class UnoGUI:
         self.animating = False
         self.update_ui()
 
+    # BOT TURNS
+    def schedule_ai(self):
+        # update_ui runs many times per turn; only the first one queues the bot
+        if self.ai_after or self.ai_future: return
+        self.ai_after = self.root.after(AI_DELAY_MS, self.run_ai)
+
     def run_ai(self):
-        if self.animating: return
-        move = self.engine.get_ai_move()
+        self.ai_after = None
+        if self.animating or self.ai_future or self.engine.game_over: return
+        if not self.engine.get_current_player().is_ai: return
+        if self.ai_pool is None:
+            executor = ProcessPoolExecutor if self.ai_processes else ThreadPoolExecutor
+            self.ai_pool = executor(max_workers=1)
+        self.ai_ticket += 1
+        ticket = self.ai_ticket
+        strategies = [p.strategy for p in self.engine.seats]
+        future = self.ai_pool.submit(think, self.engine.snapshot(), self.engine.open_hand, strategies)
+        future.add_done_callback(lambda f: self.ai_results.put((ticket, f)))
+        self.ai_future = future
+        self.ai_poll = self.root.after(AI_POLL_MS, self.poll_ai)
+
+    def poll_ai(self):
+        self.ai_poll = None
+        while True:
+            try:
+                ticket, future = self.ai_results.get_nowait()
+            except queue.Empty:
+                break
+            # Anything asked before the last cancel is dropped
+            if ticket == self.ai_ticket and not future.cancelled():
+                self.ai_future = None
+                try:
+                    move = future.result()
+                except Exception as exc:
+                    move = self.ai_failed(exc)
+                self.apply_ai_move(move)
+                return
+        if self.ai_future:
+            self.ai_poll = self.root.after(AI_POLL_MS, self.poll_ai)
+
+    def ai_failed(self, exc):
+        # A strategy or worker blew up: report it and let the built-in bot
+        # take this turn, so the game never stalls waiting on a dead search
+        player = self.engine.get_current_player()
+        print(f"AI search for {player.name} failed, using the built-in bot:", file=sys.stderr)
+        traceback.print_exception(exc)
+        if isinstance(exc, BrokenExecutor):
+            # A dead process pool fails every later submit; run_ai starts a fresh one
+            self.ai_pool.shutdown(wait=False, cancel_futures=True)
+            self.ai_pool = None
+        return self.engine.heuristic_move(player)
+
+    def cancel_ai(self):
+        self.ai_ticket += 1
+        if self.ai_after:
+            self.root.after_cancel(self.ai_after)
+            self.ai_after = None
+        if self.ai_poll:
+            self.root.after_cancel(self.ai_poll)
+            self.ai_poll = None
+        if self.ai_future:
+            # A search already running finishes in the pool and is ignored
+            self.ai_future.cancel()
+            self.ai_future = None
+
+    def close(self):
+        self.cancel_ai()
+        if self.ai_pool:
+            self.ai_pool.shutdown(wait=False, cancel_futures=True)
+            self.ai_pool = None
+
+    def apply_ai_move(self, move):
         if not move: return
 
         self.animating = True
@@ -753,13 +999,13 @@ class UnoGUI:
 
     def animate_fly(self, start_widget, end_widget, on_complete):
         flyer = tk.Canvas(self.root, width=80, height=120, highlightthickness=0, bg=COLORS['BG'])
-        flyer.create_rectangle(2, 2, 78, 118, fill="#e74c3c", outline="white", width=2)
-        flyer.create_oval(15, 35, 65, 85, outline="yellow", width=2)
+        flyer.sprite = SPRITES.get(('back', 80, 120), lambda: render_card_back(flyer, 80, 120))
+        flyer.create_image(0, 0, image=flyer.sprite, anchor="nw")
         flyer.create_text(40, 60, text="UNO", fill="yellow", font=("Arial Black", 12, "italic"))
-        self._do_fly(flyer, start_widget, end_widget, on_complete)
+        return self._do_fly(flyer, start_widget, end_widget, on_complete)
 
     def animate_ai_fly(self, start_widget, end_widget, custom_flyer, on_complete):
-        self._do_fly(custom_flyer, start_widget, end_widget, on_complete)
+        return self._do_fly(custom_flyer, start_widget, end_widget, on_complete)
 
     def _do_fly(self, flyer, start_widget, end_widget, on_complete):
         try:
@@ -776,32 +1022,107 @@ class UnoGUI:
             on_complete()
             return
 
-        flyer.place(x=sx, y=sy)
-        steps = 15
-        dx = (ex - sx) / steps
-        dy = (ey - sy) / steps
+        def move(p):
+            flyer.place(x=sx + (ex - sx) * p, y=sy + (ey - sy) * p)
 
-        def step(i):
-            if i < steps:
-                flyer.place(x=sx + dx*i, y=sy + dy*i)
-                self.root.after(20, lambda: step(i+1))
-            else:
-                flyer.destroy()
-                on_complete()
-        step(0)
+        def finish():
+            flyer.destroy()
+            on_complete()
+
+        return self.animator.add(FLY_MS, move, finish)
+
+    # PROFILING
+    def enable_profiling(self, profiler=None):
+        # F3 toggles the latency overlay, F4 writes a Chrome trace to trace_path
+        self.profiler = profiler or Profiler()
+        self.profiler.instrument(self, GUI_HOOKS)
+        self.profiler.instrument(self.animator, ['tick'])
+        self.profiler.instrument(ModernCard, ['__init__', 'draw_card'])
+        self.profiler.instrument(ParticleSystem, ['tick'])
+        if getattr(self, 'engine', None): self.profiler.instrument(self.engine, ENGINE_HOOKS)
+        self.root.bind("<F3>", lambda e: self.toggle_profiler_overlay())
+        self.root.bind("<F4>", lambda e: self.export_trace())
+        return self.profiler
+
+    def disable_profiling(self):
+        if not self.profiler: return
+        self.profiler.uninstall()
+        self.profiler = None
+        self.root.unbind("<F3>")
+        self.root.unbind("<F4>")
+        if self.profiler_overlay: self.toggle_profiler_overlay()
+
+    def toggle_profiler_overlay(self):
+        if self.profiler_overlay:
+            self.root.after_cancel(self.profiler_overlay[1])
+            if self.profiler_overlay[0].winfo_exists(): self.profiler_overlay[0].destroy()
+            self.profiler_overlay = None
+        elif self.profiler:
+            self.profiler_overlay = (None, None)
+            self.refresh_profiler_overlay()
+
+    def refresh_profiler_overlay(self):
+        label = self.profiler_overlay[0]
+        # Screen changes destroy every child of root, the overlay included
+        if label is None or not label.winfo_exists():
+            label = tk.Label(self.root, font=("Consolas", 9), bg="#000000", fg="#88FF88", justify="left", anchor="nw")
+            label.place(relx=1.0, x=-10, y=10, anchor="ne")
+        label.config(text=self.profiler.report())
+        label.lift()
+        self.profiler_overlay = (label, self.root.after(500, self.refresh_profiler_overlay))
+
+    def export_trace(self):
+        count = self.profiler.export_trace(self.trace_path)
+        print(f"Wrote {count} trace events to {self.trace_path}")
+
+    def open_replay(self, path, game=0):
+        # Imported here so a plain game never pays for the archive module
+        from uno_engine.archive import ReplayArchive
+        archive = ReplayArchive(path)
+        viewer = ReplayViewer(self.root, archive, game)
+        viewer.bind("<Destroy>", lambda e: archive.close() if e.widget is viewer else None)
+        return viewer
 
     def sort_hand(self, key):
+        # A one-shot sort, unless keep-sorted is on, where it changes the kept key
         if self.animating: return
-        t = self.engine.players.head
-        human = None
-        for _ in range(3):
-            if t.data.name == "You": human = t.data
-            t = t.next
-        if human:
-            human.hand = merge_sort_hand(human.hand, key)
-            self.update_ui()
+        self.sort_choice = key
+        human = self.engine.players.find("You")
+        if not human: return
+        if human.hand.sort_key is None:
+            human.hand.sort(key)
+        else:
+            human.hand.keep_sorted(key)
+        self.update_ui()
+
+    def toggle_keep_sorted(self):
+        # On: drawn cards are slotted into place by the last sort key used
+        if self.animating: return
+        human = self.engine.players.find("You")
+        if not human: return
+        human.hand.keep_sorted(None if human.hand.sort_key else self.sort_choice)
+        self.keep_sorted_btn.config(text=f"Keep Sorted: {'On' if human.hand.sort_key else 'Off'}")
+        self.update_ui()
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pixel UNO")
+    parser.add_argument("--profile", action="store_true", help="time engine and UI hooks (F3 overlay, F4 trace)")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace on exit (implies --profile)")
+    parser.add_argument("--ai-processes", action="store_true", help="run bot searches in a process instead of a thread")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="open a replay archive in the scrubber")
+    parser.add_argument("--game", type=int, default=0, help="game to open with --replay")
+    args = parser.parse_args()
+
     root = tk.Tk()
     app = UnoGUI(root)
+    app.ai_processes = args.ai_processes
+    if args.profile or args.trace:
+        app.enable_profiling()
+        if args.trace: app.trace_path = args.trace
+    if args.replay: app.open_replay(args.replay, args.game)
     root.mainloop()
+    app.close()
+    if app.profiler:
+        print(app.profiler.report())
+        if args.trace: app.export_trace()
@@ -0,0 +1,345 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing as mp
+import time
+from collections import OrderedDict
+
+from uno_engine import BLACK, CARDS, COLOR_NAMES, LatencyHistogram, UnoEngine
+
+HUMAN_SEAT = 0
+IDLE_TIMEOUT = 300.0
+MAX_TABLES = 10000
+# Default bots take microseconds a move; yield to the loop every few anyway
+BOT_SLICE = 8
+
+# PROTOCOL
+# Newline-delimited JSON. Every request has an "op" and may carry an "id",
+# which is echoed back so one connection can multiplex many tables:
+#   {"op": "new", "players": 3, "decks": 1}        -> table view
+#   {"op": "state", "table": t}                    -> table view
+#   {"op": "play", "table": t, "idx": i, "color": "Red"}
+#   {"op": "draw", "table": t}
+#   {"op": "close", "table": t}
+#   {"op": "stats"}
+# Replies are {"ok": true, ...} or {"ok": false, "error": "..."}. Cards are
+# ids into CARDS, colours are colour ids.
+class Table:
+    def __init__(self, table_id, seed=None, players=3, decks=1):
+        self.id = table_id
+        self.engine = UnoEngine(record_events=False, seed=seed)
+        self.engine.initialize_game(players, decks)
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+    def view(self):
+        engine = self.engine
+        human = engine.seats[HUMAN_SEAT]
+        current = engine.get_current_player()
+        your_turn = not engine.game_over and current is human
+        return {
+            'table': self.id,
+            'hand': [c.id for c in human.hand],
+            'top': engine.discard.peek().id,
+            'color': engine.current_color,
+            'direction': engine.direction,
+            'current': current.seat,
+            'counts': [len(p.hand) for p in engine.seats],
+            'deck': engine.deck.size(),
+            'turn': engine.turn,
+            'your_turn': your_turn,
+            'playable': engine.playable_indices(human) if your_turn else [],
+            'game_over': engine.game_over,
+            'winner': engine.winner.seat if engine.winner else None,
+        }
+
+# SERVER
+class GameServer:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_tables=MAX_TABLES):
+        self.idle_timeout = idle_timeout
+        self.max_tables = max_tables
+        # Least recently used table first, so eviction only looks at the front
+        self.tables = OrderedDict()
+        self.ids = itertools.count(1)
+        self.stats = {'opened': 0, 'closed': 0, 'evicted': 0, 'moves': 0, 'bot_moves': 0}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                request = {}
+                try:
+                    request = json.loads(line)
+                    response = await self.dispatch(request)
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {'ok': False, 'error': str(e) or type(e).__name__}
+                if isinstance(request, dict) and 'id' in request:
+                    response['id'] = request['id']
+                writer.write(json.dumps(response).encode() + b"\n")
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        op = request['op']
+        if op == 'new':
+            return self.open_table(request.get('seed'), request.get('players', 3), request.get('decks', 1))
+        if op == 'stats':
+            return dict(self.stats, ok=True, tables=len(self.tables))
+
+        table = self.table(request['table'])
+        async with table.lock:
+            if op == 'state':
+                pass
+            elif op == 'close':
+                self.drop(table)
+                self.stats['closed'] += 1
+                return {'ok': True, 'table': table.id}
+            elif op in ('play', 'draw'):
+                await self.human_move(table, op, request)
+            else:
+                raise ValueError(f"unknown op {op!r}")
+            return dict(table.view(), ok=True)
+
+    def open_table(self, seed=None, players=3, decks=1):
+        if len(self.tables) >= self.max_tables:
+            raise ValueError("server full")
+        table = Table(next(self.ids), seed, players, decks)
+        self.tables[table.id] = table
+        self.stats['opened'] += 1
+        return dict(table.view(), ok=True)
+
+    def table(self, table_id):
+        table = self.tables.get(table_id)
+        if table is None: raise ValueError(f"unknown table {table_id}")
+        table.last_active = time.monotonic()
+        self.tables.move_to_end(table_id)
+        return table
+
+    def drop(self, table):
+        self.tables.pop(table.id, None)
+
+    async def human_move(self, table, op, request):
+        engine = table.engine
+        human = engine.seats[HUMAN_SEAT]
+        if engine.game_over: raise ValueError("game is over")
+        if engine.get_current_player() is not human: raise ValueError("not your turn")
+        if op == 'play':
+            idx = request['idx']
+            if idx not in engine.playable_indices(human): raise ValueError(f"card {idx} is not playable")
+            color = request.get('color')
+            if color is not None and COLOR_NAMES.index(color) >= BLACK:
+                raise ValueError(f"bad colour {color!r}")
+            engine.play_card(human, idx, color)
+        else:
+            engine.draw_card(human)
+        self.stats['moves'] += 1
+        await self.run_bots(table)
+
+    async def run_bots(self, table):
+        engine = table.engine
+        loop = asyncio.get_running_loop()
+        moves = 0
+        while not engine.game_over:
+            player = engine.get_current_player()
+            if not player.is_ai: break
+            if player.strategy:
+                # Search bots can take a while, keep them off the loop
+                move = await loop.run_in_executor(None, engine.get_ai_move)
+            else:
+                move = engine.get_ai_move()
+            if move['type'] == 'play':
+                engine.play_card(player, move['idx'], move['color'])
+            else:
+                engine.draw_card(player)
+            moves += 1
+            if moves % BOT_SLICE == 0: await asyncio.sleep(0)
+        self.stats['bot_moves'] += moves
+
+    async def evict_idle(self, interval=5.0):
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            while self.tables:
+                table = next(iter(self.tables.values()))
+                if table.last_active > cutoff or table.lock.locked(): break
+                self.drop(table)
+                self.stats['evicted'] += 1
+
+async def serve(host, port, idle_timeout=IDLE_TIMEOUT, max_tables=MAX_TABLES):
+    game_server = GameServer(idle_timeout, max_tables)
+    server = await asyncio.start_server(game_server.handle, host, port)
+    reaper = asyncio.create_task(game_server.evict_idle(min(5.0, idle_timeout / 2)))
+    print(f"Serving UNO tables on {host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reaper.cancel()
+
+def run_server(host, port, idle_timeout=IDLE_TIMEOUT, max_tables=MAX_TABLES):
+    try:
+        asyncio.run(serve(host, port, idle_timeout, max_tables))
+    except KeyboardInterrupt:
+        pass
+
+# LOAD GENERATOR
+class Client:
+    # One connection, many in-flight requests matched back up by id
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}
+        self.reader_task = asyncio.create_task(self.read_loop())
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps(dict(fields, op=op, id=request_id)).encode() + b"\n")
+        return await future
+
+    async def read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line: break
+                response = json.loads(line)
+                future = self.pending.pop(response['id'], None)
+                if future and not future.done(): future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done(): future.set_exception(ConnectionError("server closed the connection"))
+            self.pending.clear()
+
+    def close(self):
+        self.reader_task.cancel()
+        self.writer.close()
+
+def pick_move(view):
+    # Same policy as the default bot: first playable card, wilds take the commonest colour
+    if not view['playable']: return 'draw', {}
+    idx = view['playable'][0]
+    color = None
+    if CARDS[view['hand'][idx]].color_id == BLACK:
+        counts = [0] * BLACK
+        for card_id in view['hand']:
+            if CARDS[card_id].color_id < BLACK: counts[CARDS[card_id].color_id] += 1
+        color = COLOR_NAMES[counts.index(max(counts))]
+    return 'play', {'idx': idx, 'color': color}
+
+async def play_table(client, stop_at, latency, totals):
+    view = await client.request('new')
+    while time.perf_counter() < stop_at:
+        if not view['ok']:
+            totals['errors'] += 1
+            view = await client.request('new')
+            continue
+        if view['game_over']:
+            totals['games'] += 1
+            await client.request('close', table=view['table'])
+            view = await client.request('new')
+            continue
+        op, fields = pick_move(view)
+        table_id = view['table']
+        started = time.perf_counter()
+        view = await client.request(op, table=table_id, **fields)
+        latency.add((time.perf_counter() - started) * 1000)
+        totals['moves'] += 1
+    if view.get('ok') and 'table' in view:
+        await client.request('close', table=view['table'])
+
+async def load_step(clients, n_tables, duration):
+    latency = LatencyHistogram()
+    totals = {'moves': 0, 'games': 0, 'errors': 0}
+    before = await clients[0].request('stats')
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(play_table(clients[i % len(clients)], stop_at, latency, totals)
+                           for i in range(n_tables)))
+    elapsed = time.perf_counter() - start
+    after = await clients[0].request('stats')
+    return {
+        'tables': n_tables,
+        'moves_per_sec': totals['moves'] / elapsed,
+        'bot_moves_per_sec': (after['bot_moves'] - before['bot_moves']) / elapsed,
+        'games': totals['games'],
+        'errors': totals['errors'],
+        'p50_ms': latency.percentile(0.5),
+        'p99_ms': latency.percentile(0.99),
+        'p999_ms': latency.percentile(0.999),
+        'max_ms': latency.max,
+    }
+
+async def wait_for_server(host, port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await Client.connect(host, port)
+        except OSError:
+            if time.perf_counter() > deadline: raise
+            await asyncio.sleep(0.1)
+
+async def run_load(host, port, table_counts, connections, duration):
+    first = await wait_for_server(host, port)
+    clients = [first] + [await Client.connect(host, port) for _ in range(connections - 1)]
+    print(f"{'tables':>7} {'moves/s':>9} {'bot moves/s':>12} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'p99.9 ms':>9} {'max ms':>8} {'games':>6} {'errors':>6}")
+    results = []
+    try:
+        for n_tables in table_counts:
+            r = await load_step(clients, n_tables, duration)
+            results.append(r)
+            print(f"{r['tables']:7} {r['moves_per_sec']:9,.0f} {r['bot_moves_per_sec']:12,.0f} "
+                  f"{r['p50_ms']:8.2f} {r['p99_ms']:8.2f} {r['p999_ms']:9.2f} {r['max_ms']:8.2f} "
+                  f"{r['games']:6} {r['errors']:6}", flush=True)
+    finally:
+        for client in clients: client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many UNO tables over a local socket, or load-test a host")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve")
+    load_cmd = sub.add_parser("load")
+    for cmd in (serve_cmd, load_cmd):
+        cmd.add_argument("--host", default="127.0.0.1")
+        cmd.add_argument("--port", type=int, default=7777)
+    serve_cmd.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before an idle table is evicted")
+    serve_cmd.add_argument("--max-tables", type=int, default=MAX_TABLES)
+    load_cmd.add_argument("--tables", default="10,100,1000,5000", help="comma-separated table counts to step through")
+    load_cmd.add_argument("--connections", type=int, default=32)
+    load_cmd.add_argument("--duration", type=float, default=5.0, help="seconds per step")
+    load_cmd.add_argument("--spawn", action="store_true", help="start a server in a child process first")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        run_server(args.host, args.port, args.idle_timeout, args.max_tables)
+        return
+
+    table_counts = [int(n) for n in args.tables.split(",")]
+    child = None
+    if args.spawn:
+        child = mp.Process(target=run_server, args=(args.host, args.port, IDLE_TIMEOUT, max(table_counts) * 2),
+                           daemon=True)
+        child.start()
+    try:
+        asyncio.run(run_load(args.host, args.port, table_counts, args.connections, args.duration))
+    finally:
+        if child:
+            child.terminate()
+            child.join()
+
+if __name__ == "__main__":
+    main()
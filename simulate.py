@@ -0,0 +1,10 @@
+# The runner lives in uno_engine.headless; this keeps `python simulate.py`
+# and existing imports working
+from uno_engine.headless import (MAX_TURNS, SimStats, chunk_seed, format_report, iter_tasks, main, new_bot_game,
+                                 play_headless_game, run_chunk, run_simulation)
+
+__all__ = ['MAX_TURNS', 'SimStats', 'chunk_seed', 'format_report', 'iter_tasks', 'main', 'new_bot_game',
+           'play_headless_game', 'run_chunk', 'run_simulation']
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+
+from uno_engine import BLACK, COLOR_NAMES, DRAW2, REVERSE, SKIP, CardTracker
+from ismcts import ISMCTSStrategy
+from uno_engine.headless import MAX_TURNS, chunk_seed, new_bot_game, play_headless_game
+
+CHECKPOINT_VERSION = 1
+START_ELO = 1500.0
+ELO_K = 16.0
+
+# STRATEGIES
+# The built-in heuristic is a player with no strategy object
+class RandomStrategy:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, engine, player):
+        playable = engine.playable_indices(player)
+        if not playable: return {'type': 'draw'}
+        idx = self.rng.choice(playable)
+        card = player.hand[idx]
+        color = self.rng.choice(COLOR_NAMES[:BLACK]) if card.color_id == BLACK else None
+        return {'type': 'play', 'idx': idx, 'color': color, 'card_obj': card}
+
+class GreedyStrategy:
+    # Attack cards first, then the colour it holds most of, wilds last
+    RANK = {DRAW2: 3, SKIP: 2, REVERSE: 1}
+
+    def __init__(self, seed=None):
+        pass
+
+    def choose_move(self, engine, player):
+        playable = engine.playable_indices(player)
+        if not playable: return {'type': 'draw'}
+        counts = player.hand.color_counts
+
+        def score(i):
+            card = player.hand[i]
+            if card.color_id == BLACK: return (-1, 0)
+            return (self.RANK.get(card.value_id, 0), counts[card.color_id])
+        idx = max(playable, key=score)
+        card = player.hand[idx]
+        color = COLOR_NAMES[player.hand.best_color()] if card.color_id == BLACK else None
+        return {'type': 'play', 'idx': idx, 'color': color, 'card_obj': card}
+
+class CountingStrategy:
+    # Greedy, but steers the colour towards what the next seat is least
+    # likely to follow, using a CardTracker per seat it plays
+    def __init__(self, seed=None):
+        self.trackers = {}
+
+    def attach(self, engine, player):
+        # Called when seated, before the first card is played, so no play
+        # or void inference is missed while waiting for this seat's turn
+        self.trackers[player.seat] = CardTracker(engine, player)
+
+    def follow_copy(self, engine, player):
+        # engine is a private copy of the attached table (the GUI searches on
+        # one off the Tk thread); the copy gets its own tracker, the original is untouched
+        tracker = self.trackers.get(player.seat)
+        if tracker is not None: tracker.copy_to(engine)
+
+    def tracker(self, engine, player):
+        tracker = self.trackers.get(player.seat)
+        if tracker is not None and tracker.engine is engine: return tracker
+        for tracker in engine.trackers:
+            if tracker.viewer is player: return tracker
+        self.attach(engine, player)
+        return self.trackers[player.seat]
+
+    def choose_move(self, engine, player):
+        playable = engine.playable_indices(player)
+        if not playable: return {'type': 'draw'}
+        tracker = self.tracker(engine, player)
+        follow = [tracker.p_next_can_follow(c) for c in range(BLACK)]
+        counts = player.hand.color_counts
+
+        def score(i):
+            card = player.hand[i]
+            if card.color_id == BLACK: return (-1.0, 0)
+            return (GreedyStrategy.RANK.get(card.value_id, 0) - follow[card.color_id], counts[card.color_id])
+        idx = max(playable, key=score)
+        card = player.hand[idx]
+        color = None
+        if card.color_id == BLACK:
+            # A colour we hold that the next seat probably can't answer
+            color = COLOR_NAMES[max(range(BLACK), key=lambda c: (counts[c] > 0, -follow[c], counts[c]))]
+        return {'type': 'play', 'idx': idx, 'color': color, 'card_obj': card}
+
+STRATEGIES = {
+    'heuristic': lambda seed=None: None,
+    'random': RandomStrategy,
+    'greedy': GreedyStrategy,
+    'counting': CountingStrategy,
+    'ismcts': lambda seed=None, budget_ms=20, exploration=0.7: ISMCTSStrategy(int(budget_ms), 1, float(exploration), seed),
+}
+
+def build_strategy(spec, seed):
+    # "name" or "name:key=value,key=value"
+    name, _, params = spec.partition(':')
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {name!r}, choose from {', '.join(STRATEGIES)}")
+    kwargs = dict(p.split('=', 1) for p in params.split(',')) if params else {}
+    return STRATEGIES[name](seed=seed, **kwargs)
+
+# MATCHES
+def seat_plan(players, a_first):
+    # Strategies alternate round the table; the paired game swaps them
+    return [(i + (0 if a_first else 1)) % 2 for i in range(players)]
+
+def run_match(task):
+    pair_id, task_id, spec_a, spec_b, seed, n_games, players, decks, max_turns = task
+    seeds = random.Random(seed)
+    wins = [0, 0]
+    draws = 0
+    for _ in range(n_games):
+        game_seed = seeds.getrandbits(64)
+        # Same deal twice with the seats swapped, so neither side keeps a lucky seat
+        for a_first in (True, False):
+            engine = new_bot_game(seed=game_seed, players=players, decks=decks)
+            sides = seat_plan(players, a_first)
+            strategies = [build_strategy(spec_a, game_seed), build_strategy(spec_b, game_seed)]
+            for player, side in zip(engine.seats, sides):
+                player.strategy = strategies[side]
+                if hasattr(player.strategy, 'attach'): player.strategy.attach(engine, player)
+            play_headless_game(engine, max_turns)
+            if engine.game_over:
+                wins[sides[engine.winner.seat]] += 1
+            else:
+                draws += 1
+    return pair_id, task_id, wins[0], wins[1], draws
+
+# RATINGS
+def elo_to_p(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def sprt_status(wins_a, wins_b, elo_margin, alpha, beta):
+    # Two one-sided SPRTs on decisive games: "A is margin stronger" and "B is".
+    # Both accepting H0 means the pair is within the margin.
+    p1 = elo_to_p(elo_margin)
+    upper = math.log((1 - beta) / alpha)
+    lower = math.log(beta / (1 - alpha))
+    llr_a = wins_a * math.log(p1 / 0.5) + wins_b * math.log((1 - p1) / 0.5)
+    llr_b = wins_b * math.log(p1 / 0.5) + wins_a * math.log((1 - p1) / 0.5)
+    if llr_a >= upper: return 'a_better'
+    if llr_b >= upper: return 'b_better'
+    if llr_a <= lower and llr_b <= lower: return 'no_difference'
+    return 'running'
+
+class Tournament:
+    def __init__(self, specs, players=2, decks=1, base_seed=0, games_per_task=10, max_games=2000,
+                 elo_margin=50.0, alpha=0.05, beta=0.05, max_turns=MAX_TURNS):
+        self.config = {'specs': list(specs), 'players': players, 'decks': decks, 'base_seed': base_seed,
+                       'games_per_task': games_per_task, 'max_games': max_games, 'elo_margin': elo_margin,
+                       'alpha': alpha, 'beta': beta, 'max_turns': max_turns}
+        self.pairs = [{'a': a, 'b': b, 'wins_a': 0, 'wins_b': 0, 'draws': 0, 'done': [], 'status': 'running'}
+                      for i, a in enumerate(specs) for b in specs[i + 1:]]
+        self.elo = {spec: START_ELO for spec in specs}
+        self.record = {spec: [0, 0, 0] for spec in specs}
+        self.scheduled = [set() for _ in self.pairs]
+
+    def games(self, pair):
+        return pair['wins_a'] + pair['wins_b'] + pair['draws']
+
+    def next_task(self):
+        # Least-played open pairing first, so pairs advance together.
+        # A task plays 2 * games_per_task games (each deal from both seat orders).
+        best = None
+        for pair_id, pair in enumerate(self.pairs):
+            if pair['status'] != 'running': continue
+            if len(self.scheduled[pair_id]) * 2 * self.config['games_per_task'] >= self.config['max_games']: continue
+            if best is None or len(self.scheduled[pair_id]) < len(self.scheduled[best]): best = pair_id
+        if best is None: return None
+        task_id = 0
+        while task_id in self.scheduled[best]: task_id += 1
+        self.scheduled[best].add(task_id)
+        pair = self.pairs[best]
+        c = self.config
+        seed = chunk_seed(chunk_seed(c['base_seed'], best), task_id)
+        return (best, task_id, pair['a'], pair['b'], seed, c['games_per_task'], c['players'], c['decks'], c['max_turns'])
+
+    def add_result(self, result):
+        pair_id, task_id, wins_a, wins_b, draws = result
+        pair = self.pairs[pair_id]
+        pair['wins_a'] += wins_a
+        pair['wins_b'] += wins_b
+        pair['draws'] += draws
+        pair['done'].append(task_id)
+        a, b = pair['a'], pair['b']
+        for spec, won, lost in ((a, wins_a, wins_b), (b, wins_b, wins_a)):
+            self.record[spec][0] += won
+            self.record[spec][1] += lost
+            self.record[spec][2] += draws
+
+        # One Elo step for the whole task, draws count half
+        n = wins_a + wins_b + draws
+        expected = 1 / (1 + 10 ** ((self.elo[b] - self.elo[a]) / 400))
+        delta = ELO_K * ((wins_a + draws / 2) - n * expected)
+        self.elo[a] += delta
+        self.elo[b] -= delta
+
+        if pair['status'] == 'running':
+            c = self.config
+            pair['status'] = sprt_status(pair['wins_a'], pair['wins_b'], c['elo_margin'], c['alpha'], c['beta'])
+            if pair['status'] == 'running' and self.games(pair) >= c['max_games']:
+                pair['status'] = 'max_games'
+
+    # CHECKPOINTS
+    def to_dict(self):
+        return {'version': CHECKPOINT_VERSION, 'config': self.config, 'pairs': self.pairs,
+                'elo': self.elo, 'record': self.record}
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {data.get('version')}")
+        if data['config'] != self.config:
+            raise ValueError(f"{path} is for a different tournament (start fresh with --fresh)")
+        self.pairs, self.elo, self.record = data['pairs'], data['elo'], data['record']
+        # Tasks that were in flight when interrupted get scheduled again
+        self.scheduled = [set(pair['done']) for pair in self.pairs]
+
+    def leaderboard(self):
+        lines = [f"{'#':>2}  {'strategy':28} {'elo':>7} {'games':>7} {'won':>6} {'lost':>6} {'drawn':>6} {'score':>7}"]
+        ranked = sorted(self.elo, key=lambda s: -self.elo[s])
+        for rank, spec in enumerate(ranked, 1):
+            won, lost, drawn = self.record[spec]
+            games = won + lost + drawn
+            score = (won + drawn / 2) / games * 100 if games else 0.0
+            lines.append(f"{rank:2}  {spec:28} {self.elo[spec]:7.1f} {games:7} {won:6} {lost:6} {drawn:6} {score:6.1f}%")
+        lines.append("")
+        lines.append(f"{'pairing':48} {'score':>11} {'drawn':>6}  result")
+        for pair in self.pairs:
+            name = f"{pair['a']} vs {pair['b']}"
+            lines.append(f"{name:48} {pair['wins_a']:5}-{pair['wins_b']:<5} {pair['draws']:6}  {pair['status']}")
+        return "\n".join(lines)
+
+# SCHEDULER
+def run_tournament(tournament, workers=None, checkpoint=None, leaderboard=None, save_every=5.0, on_result=None):
+    workers = workers or os.cpu_count() or 1
+    results = queue.Queue()
+    last_save = time.perf_counter()
+
+    def save():
+        if checkpoint: tournament.save(checkpoint)
+        if leaderboard:
+            with open(leaderboard, "w") as f:
+                f.write(tournament.leaderboard() + "\n")
+
+    try:
+        with mp.Pool(workers) as pool:
+            in_flight = 0
+            while True:
+                # Tasks are handed out one by one so a decided pairing stops getting work
+                while in_flight < workers * 2:
+                    task = tournament.next_task()
+                    if task is None: break
+                    pool.apply_async(run_match, (task,), callback=results.put, error_callback=results.put)
+                    in_flight += 1
+                if in_flight == 0: break
+                result = results.get()
+                in_flight -= 1
+                if isinstance(result, BaseException): raise result
+                tournament.add_result(result)
+                if on_result: on_result(tournament, result)
+                if time.perf_counter() - last_save >= save_every:
+                    save()
+                    last_save = time.perf_counter()
+    finally:
+        # Interrupted or not, completed tasks are kept
+        save()
+    return tournament
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between AI strategies")
+    parser.add_argument("strategies", nargs="*", default=["heuristic", "greedy", "random"],
+                        help=f"strategy specs, e.g. ismcts:budget_ms=20 (known: {', '.join(STRATEGIES)})")
+    parser.add_argument("--players", type=int, default=2, help="seats per game, shared alternately by the pair")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--games-per-task", type=int, default=10, help="deals per task, each played twice")
+    parser.add_argument("--max-games", type=int, default=2000, help="cap per pairing")
+    parser.add_argument("--elo-margin", type=float, default=50.0, help="smallest Elo gap worth detecting")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default="tournament.json")
+    parser.add_argument("--leaderboard", default="leaderboard.txt")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if len(set(args.strategies)) < 2:
+        parser.error("need at least two different strategies")
+    tournament = Tournament(args.strategies, args.players, args.decks, args.seed, args.games_per_task,
+                            args.max_games, args.elo_margin, args.alpha, args.beta)
+    if not args.fresh and os.path.exists(args.checkpoint):
+        tournament.load(args.checkpoint)
+        done = sum(tournament.games(p) for p in tournament.pairs)
+        print(f"Resuming from {args.checkpoint} ({done:,} games played)")
+
+    start = time.perf_counter()
+
+    def progress(t, result):
+        played = sum(t.games(p) for p in t.pairs)
+        running = sum(p['status'] == 'running' for p in t.pairs)
+        print(f"\r{played:,} games, {running} pairings running, {time.perf_counter() - start:.0f}s", end="", flush=True)
+
+    run_tournament(tournament, args.workers, args.checkpoint, args.leaderboard, on_result=progress)
+    print()
+    print(tournament.leaderboard())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# Headless UNO engine: cards, data structures, rules, replay and profiling.
+# Nothing in here imports tkinter, so simulation workers start quickly and
+# run on machines without Tk; the GUI in pixelunogame.py builds on top of it.
+from .cards import (BLACK, BLUE, CARDS, COLOR_IDS, COLOR_NAMES, DECK_SIZE, DRAW2, GREEN, HAND_SIZE, MAX_DECKS,
+                    MAX_PLAYERS, MIN_PLAYERS, RED, REVERSE, SKIP, SORT_KEYS, VALUE_NAMES, WILD, WILD4, YELLOW,
+                    Card, card_from_id, shoe)
+from .endgame import ENDGAME_CARDS, EndgameSolver
+from .engine import (EV_COLOR, EV_DEAL, EV_DRAW, EV_EMPTY, EV_LEAVE, EV_PENALTY, EV_PLAY, EV_RESHUFFLE,
+                     EV_REVERSE, EV_SKIP, EV_START, SNAPSHOT_VERSION, Hand, Player, UnoEngine, apply_event,
+                     replay_game)
+from .profiling import ENGINE_HOOKS, LatencyHistogram, Profiler
+from .sorting import merge, merge_sort_hand
+from .structures import ActionQueue, CardStack, CircularDoublyLinkedList, EventJournal, Node
+from .tracking import CardTracker
+
+__all__ = ['BLACK', 'BLUE', 'CARDS', 'COLOR_IDS', 'COLOR_NAMES', 'DECK_SIZE', 'DRAW2', 'GREEN', 'HAND_SIZE',
+           'MAX_DECKS', 'MAX_PLAYERS', 'MIN_PLAYERS', 'RED', 'REVERSE', 'SKIP', 'SORT_KEYS', 'VALUE_NAMES',
+           'WILD', 'WILD4', 'YELLOW', 'Card', 'card_from_id', 'shoe', 'ENDGAME_CARDS', 'EndgameSolver',
+           'EV_COLOR', 'EV_DEAL', 'EV_DRAW', 'EV_EMPTY', 'EV_LEAVE', 'EV_PENALTY', 'EV_PLAY', 'EV_RESHUFFLE',
+           'EV_REVERSE', 'EV_SKIP', 'EV_START', 'SNAPSHOT_VERSION', 'Hand', 'Player', 'UnoEngine',
+           'apply_event', 'replay_game', 'ENGINE_HOOKS', 'LatencyHistogram', 'Profiler', 'merge',
+           'merge_sort_hand', 'ActionQueue', 'CardStack', 'CircularDoublyLinkedList', 'EventJournal', 'Node',
+           'CardTracker']
@@ -0,0 +1,5 @@
+# python -m uno_engine: batch bot-only games without loading the GUI
+from .headless import main
+
+if __name__ == "__main__":
+    main()
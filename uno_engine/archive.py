@@ -0,0 +1,242 @@
+import mmap
+import multiprocessing as mp
+import os
+import random
+import struct
+from bisect import bisect_right
+
+from .cards import COLOR_NAMES
+from .engine import EV_COLOR, EV_DEAL, EV_DRAW, EV_EMPTY, EV_LEAVE, EV_PLAY, UnoEngine, apply_event
+from .headless import MAX_TURNS, chunk_seed, new_bot_game, play_headless_game
+from .structures import EventJournal
+
+# REPLAY ARCHIVE
+# games.uar holds game records back to back and is only ever appended to;
+# games.uar.idx holds one fixed-width (offset, length) entry per game, so
+# game N is one lookup away. A record is the seed, the decisions only
+# (plays, declared colours, draws, leaves) and engine snapshots every
+# KEYFRAME_EVERY turns, so any turn is at most that many moves from a keyframe.
+ARCHIVE_MAGIC = b"UNOA\x01\x00\x00\x00"
+GAME_HEADER = struct.Struct('<QIIHBB')   # seed, events, turns, keyframes, players, decks
+KEYFRAME = struct.Struct('<III')         # turn, event index, snapshot length
+INDEX_ENTRY = struct.Struct('<QI')       # record offset, record length
+KEYFRAME_EVERY = 32
+DECISIONS = frozenset((EV_DEAL, EV_COLOR, EV_PLAY, EV_DRAW, EV_EMPTY, EV_LEAVE))
+
+def pack_game(seed, journal, keyframe_every=KEYFRAME_EVERY):
+    # Replays the journal once to take the keyframes
+    events = [e for e in journal if e[0] in DECISIONS]
+    players, decks = (events[0][1], events[0][2]) if events and events[0][0] == EV_DEAL else (3, 1)
+    engine = UnoEngine(record_events=False, seed=seed)
+    engine.initialize_game(players, decks)
+    # Turn 0 is re-dealt from the seed, so the first keyframe is at keyframe_every;
+    # snapshots carry the RNG state and are most of a record's size
+    keyframes = []
+    chosen = None
+    for index, (kind, seat, arg) in enumerate(events):
+        # Never between a declared colour and its wild
+        if chosen is None and engine.turn >= (len(keyframes) + 1) * keyframe_every:
+            keyframes.append((engine.turn, index, engine.snapshot()))
+        chosen = apply_event(engine, kind, seat, arg, chosen)
+
+    stream = EventJournal()
+    for event in events:
+        stream.append(*event)
+    parts = [GAME_HEADER.pack(seed, len(events), engine.turn, len(keyframes), players, decks), stream.buffer]
+    parts.extend(KEYFRAME.pack(turn, index, len(snap)) for turn, index, snap in keyframes)
+    parts.extend(snap for _, _, snap in keyframes)
+    return b"".join(parts)
+
+class ArchiveWriter:
+    def __init__(self, path, keyframe_every=KEYFRAME_EVERY):
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.data = open(path, "ab+")
+        self.index = open(path + ".idx", "ab+")
+        if self.data.tell() == 0:
+            self.data.write(ARCHIVE_MAGIC)
+        self.recover()
+
+    def recover(self):
+        # A crash can leave half an entry or a record the index never got;
+        # both are cut back to the last complete game
+        size = self.index.seek(0, os.SEEK_END)
+        self.index.truncate(size - size % INDEX_ENTRY.size)
+        end = len(ARCHIVE_MAGIC)
+        if size >= INDEX_ENTRY.size:
+            self.index.seek(size - size % INDEX_ENTRY.size - INDEX_ENTRY.size)
+            offset, length = INDEX_ENTRY.unpack(self.index.read(INDEX_ENTRY.size))
+            end = offset + length
+        if self.data.seek(0, os.SEEK_END) > end:
+            self.data.truncate(end)
+        self.data.seek(0, os.SEEK_END)
+        self.index.seek(0, os.SEEK_END)
+        self.count = self.index.tell() // INDEX_ENTRY.size
+
+    def append_record(self, record):
+        # The record goes down before its index entry, so readers never see a dangling offset
+        offset = self.data.tell()
+        self.data.write(record)
+        self.data.flush()
+        self.index.write(INDEX_ENTRY.pack(offset, len(record)))
+        self.count += 1
+        return self.count - 1
+
+    def append(self, seed, journal):
+        return self.append_record(pack_game(seed, journal, self.keyframe_every))
+
+    def append_engine(self, engine):
+        return self.append(engine.seed, engine.journal)
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class GameRecord:
+    # Copies out only this game's bytes, so records outlive the archive's maps
+    def __init__(self, buf, offset):
+        (self.seed, self.n_events, self.turns, n_keyframes,
+         self.players, self.decks) = GAME_HEADER.unpack_from(buf, offset)
+        offset += GAME_HEADER.size
+        self.events = buf[offset:offset + self.n_events * EventJournal.RECORD.size]
+        offset += len(self.events)
+        self.keyframes = []
+        blob = offset + n_keyframes * KEYFRAME.size
+        for k in range(n_keyframes):
+            turn, index, length = KEYFRAME.unpack_from(buf, offset + k * KEYFRAME.size)
+            self.keyframes.append((turn, index, buf[blob:blob + length]))
+            blob += length
+        self.keyframe_turns = [k[0] for k in self.keyframes]
+
+    def journal(self):
+        return EventJournal(self.events)
+
+    def engine_at(self, turn, record_events=True):
+        # Nearest keyframe at or before turn (or the deal), then the decisions after it
+        k = bisect_right(self.keyframe_turns, turn) - 1
+        engine = UnoEngine(record_events, self.seed)
+        if k < 0:
+            engine.initialize_game(self.players, self.decks)
+            index = 0
+        else:
+            _, index, snap = self.keyframes[k]
+            engine.restore(snap)
+        chosen = None
+        for kind, seat, arg in EventJournal.RECORD.iter_unpack(self.events[index * EventJournal.RECORD.size:]):
+            if engine.turn >= turn and chosen is None: break
+            chosen = apply_event(engine, kind, seat, arg, chosen)
+        return engine
+
+class ReplayArchive:
+    # Both files are memory-mapped; opening a game touches only its own pages
+    def __init__(self, path):
+        self.path = path
+        self.data_file = open(path, "rb")
+        self.index_file = open(path + ".idx", "rb")
+        self.data = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError(f"{path} is not a replay archive")
+        size = os.fstat(self.index_file.fileno()).st_size
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        # Entries written after the data map was taken are left for the next open
+        self.count = size // INDEX_ENTRY.size
+        while self.count and sum(INDEX_ENTRY.unpack_from(self.index, (self.count - 1) * INDEX_ENTRY.size)) > len(self.data):
+            self.count -= 1
+
+    def __len__(self):
+        return self.count
+
+    def game(self, number):
+        if not 0 <= number < self.count:
+            raise IndexError(f"Game {number} not in archive of {self.count}")
+        offset, _ = INDEX_ENTRY.unpack_from(self.index, number * INDEX_ENTRY.size)
+        return GameRecord(self.data, offset)
+
+    def engine_at(self, number, turn, record_events=True):
+        return self.game(number).engine_at(turn, record_events)
+
+    def close(self):
+        if isinstance(self.index, mmap.mmap): self.index.close()
+        self.data.close()
+        self.data_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# RECORDING
+def record_chunk(task):
+    seed, n_games, max_turns, players, decks, keyframe_every = task
+    seeds = random.Random(seed)
+    records = []
+    for _ in range(n_games):
+        engine = new_bot_game(record_events=True, seed=seeds.getrandbits(64), players=players, decks=decks)
+        play_headless_game(engine, max_turns)
+        records.append(pack_game(engine.seed, engine.journal, keyframe_every))
+    return records
+
+def record_games(path, total_games, workers=None, chunk_size=500, base_seed=0, max_turns=MAX_TURNS,
+                 players=3, decks=1, keyframe_every=KEYFRAME_EVERY):
+    # Workers pack records; only this process writes, in chunk order
+    tasks = [(chunk_seed(base_seed, i), min(chunk_size, total_games - first), max_turns, players, decks,
+              keyframe_every) for i, first in enumerate(range(0, total_games, chunk_size))]
+    with ArchiveWriter(path, keyframe_every) as writer:
+        first = writer.count
+        if workers == 1:
+            results = map(record_chunk, tasks)
+            for records in results:
+                for record in records: writer.append_record(record)
+        else:
+            with mp.Pool(workers) as pool:
+                for records in pool.imap(record_chunk, tasks):
+                    for record in records: writer.append_record(record)
+        return first, writer.count
+
+def describe_turn(engine):
+    player = engine.get_current_player()
+    top = engine.discard.peek()
+    lines = [f"Turn {engine.turn}: {player.name} to move, top {top}, colour {COLOR_NAMES[engine.current_color]}, "
+             f"direction {'+' if engine.direction == 1 else '-'}, deck {engine.deck.size()}"]
+    for p in engine.seats:
+        lines.append(f"  {p.name:8} {len(p.hand):2} cards: {', '.join(map(repr, p.hand))}")
+    return "\n".join(lines)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Record bot games into a replay archive, or jump to any turn")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("archive")
+    rec.add_argument("--games", type=int, default=10000)
+    rec.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--players", type=int, default=3)
+    rec.add_argument("--decks", type=int, default=1)
+    rec.add_argument("--keyframe-every", type=int, default=KEYFRAME_EVERY, help="turns between snapshots")
+    show = sub.add_parser("show")
+    show.add_argument("archive")
+    show.add_argument("game", type=int)
+    show.add_argument("turn", type=int, nargs="?", default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        first, end = record_games(args.archive, args.games, args.workers, base_seed=args.seed,
+                                  players=args.players, decks=args.decks, keyframe_every=args.keyframe_every)
+        print(f"Games {first:,}-{end - 1:,} appended to {args.archive}")
+        return
+    with ReplayArchive(args.archive) as archive:
+        record = archive.game(args.game)
+        print(f"Game {args.game}: seed {record.seed}, {record.turns} turns, {len(record.keyframes)} keyframes")
+        print(describe_turn(record.engine_at(args.turn, record_events=False)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# CARDS
+COLOR_NAMES = ['Red', 'Blue', 'Green', 'Yellow', 'Black']
+VALUE_NAMES = [str(i) for i in range(10)] + ['Skip', 'Reverse', 'Draw2', 'Wild', 'Wild4']
+COLOR_IDS = {name: i for i, name in enumerate(COLOR_NAMES)}
+RED, BLUE, GREEN, YELLOW, BLACK = range(5)
+SKIP, REVERSE, DRAW2, WILD, WILD4 = range(10, 15)
+
+class Card:
+    __slots__ = ('id', 'color_id', 'value_id', 'color', 'value')
+
+    def __init__(self, card_id, color_id, value_id):
+        object.__setattr__(self, 'id', card_id)
+        object.__setattr__(self, 'color_id', color_id)
+        object.__setattr__(self, 'value_id', value_id)
+        object.__setattr__(self, 'color', COLOR_NAMES[color_id])
+        object.__setattr__(self, 'value', VALUE_NAMES[value_id])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        # Unpickles back to the interned instance
+        return (card_from_id, (self.id,))
+    
+    def __repr__(self):
+        return f"{self.color} {self.value}"
+
+MAX_DECKS = 8
+MIN_PLAYERS, MAX_PLAYERS = 2, 20
+HAND_SIZE = 7
+
+def build_card_table(decks=MAX_DECKS):
+    # Deck d holds ids d * DECK_SIZE onwards, so every card in a shoe stays unique
+    cards = []
+    for _ in range(decks):
+        for c in range(4):
+            for v in list(range(10)) + [SKIP, REVERSE, DRAW2] * 2:
+                cards.append(Card(len(cards), c, v))
+        for v in [WILD] * 4 + [WILD4] * 4:
+            cards.append(Card(len(cards), BLACK, v))
+    return tuple(cards)
+
+# One instance per physical card, shared by every game in the process
+CARDS = build_card_table()
+DECK_SIZE = len(CARDS) // MAX_DECKS
+
+def shoe(decks=1):
+    return list(CARDS[:decks * DECK_SIZE])
+
+def card_from_id(card_id):
+    return CARDS[card_id]
+
+# Integer sort keys indexed by card id. 'color' orders by colour name
+# (alphabetically, as the hand sort always has) and then by value id;
+# value ids already run 0-9, Skip, Reverse, Draw2, Wild, Wild4.
+COLOR_SORT_RANK = [sorted(COLOR_NAMES).index(name) for name in COLOR_NAMES]
+SORT_KEYS = {
+    'color': tuple(COLOR_SORT_RANK[c.color_id] * len(VALUE_NAMES) + c.value_id for c in CARDS),
+    'value': tuple(c.value_id for c in CARDS),
+}
+SORT_KEY_FUNCS = {name: (lambda card, keys=keys: keys[card.id]) for name, keys in SORT_KEYS.items()}
@@ -0,0 +1,330 @@
+import random
+import time
+from math import comb
+
+from .cards import BLACK, COLOR_NAMES, DRAW2, MAX_DECKS, SKIP, VALUE_NAMES, WILD4
+
+# ENDGAME SOLVER
+# Open-hand analysis: both hands are visible, only the deck order is hidden.
+# Two seats left is a zero-sum game, searched as expectimax with draws as
+# chance nodes. Cards with the same face are interchangeable, so a position
+# is a multiset of faces per zone and values are the solving seat's win chance.
+# Draws keep the tree open, so most searches stop at the depth or node budget
+# and return a horizon estimate; only short forced endings are solved exactly.
+# Past 6 cards, or 2,000 nodes, the exact share barely moves but games slow
+# down tenfold.
+ENDGAME_CARDS = 6
+ME, OPP, DECK, BURIED = range(4)
+N_VALUES = len(VALUE_NAMES)
+FACES = (BLACK + 1) * N_VALUES
+EXACT, LOWER, UPPER = range(3)
+# Table depth for subtrees searched to the end without meeting the horizon
+SOLVED = 1 << 30
+
+def face_of(card):
+    return card.color_id * N_VALUES + card.value_id
+
+ZOBRIST = None
+
+def zobrist_keys():
+    # Built on first use so importing the engine stays cheap
+    global ZOBRIST
+    if ZOBRIST is None:
+        rng = random.Random(0x0E4D)
+        copies = 4 * MAX_DECKS + 1
+        cards = [[[rng.getrandbits(64) for _ in range(copies)] for _ in range(FACES)] for _ in range(4)]
+        top = [rng.getrandbits(64) for _ in range(FACES)]
+        color = [rng.getrandbits(64) for _ in range(BLACK)]
+        turn = [0, rng.getrandbits(64)]
+        ZOBRIST = (cards, top, color, turn)
+    return ZOBRIST
+
+class SearchBudget(Exception):
+    pass
+
+class EndgameSolver:
+    def __init__(self, max_depth=40, max_nodes=2_000, max_entries=1_000_000):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.z_cards, self.z_top, self.z_color, self.z_turn = zobrist_keys()
+        # Keyed on the whole position, with the solver's hand always in ME,
+        # so entries stay valid from one move, seat or game to the next
+        self.table = {}
+        self.last_stats = {}
+        # exact: searched to the end of the game; budget: stopped by max_nodes,
+        # depth: summed over the estimated (not exact) searches
+        self.totals = {'searches': 0, 'exact': 0, 'budget': 0, 'depth': 0, 'nodes': 0, 'probes': 0, 'hits': 0,
+                       'seconds': 0.0}
+
+    # POSITION
+    def load(self, engine, player):
+        other = self.opponent(engine, player)
+        self.zones = [{}, {}, {}, {}]
+        self.sizes = [0, 0, 0, 0]
+        self.key = 0
+        for zone, cards in ((ME, player.hand), (OPP, other.hand), (DECK, engine.deck.items),
+                            (BURIED, engine.discard.items[:-1])):
+            for card in cards:
+                self.add(zone, face_of(card))
+        self.top = face_of(engine.discard.peek())
+        self.color = engine.current_color
+        self.key ^= self.z_top[self.top] ^ self.z_color[self.color]
+
+    def opponent(self, engine, player):
+        node = engine.players.node_for(player.seat)
+        return node.next.data
+
+    def add(self, zone, face):
+        counts = self.zones[zone]
+        n = counts.get(face, 0) + 1
+        counts[face] = n
+        self.sizes[zone] += 1
+        self.key ^= self.z_cards[zone][face][n]
+
+    def remove(self, zone, face):
+        counts = self.zones[zone]
+        n = counts[face]
+        self.key ^= self.z_cards[zone][face][n]
+        if n == 1:
+            del counts[face]
+        else:
+            counts[face] = n - 1
+        self.sizes[zone] -= 1
+
+    def set_top(self, face, color):
+        self.key ^= self.z_top[self.top] ^ self.z_top[face] ^ self.z_color[self.color] ^ self.z_color[color]
+        self.top, self.color = face, color
+
+    def swap_piles(self):
+        # Deck refill: the cards under the top become the deck (and back again on undo)
+        z_deck, z_buried = self.z_cards[DECK], self.z_cards[BURIED]
+        for zone in (DECK, BURIED):
+            for face, n in self.zones[zone].items():
+                for k in range(1, n + 1):
+                    self.key ^= z_deck[face][k] ^ z_buried[face][k]
+        self.zones[DECK], self.zones[BURIED] = self.zones[BURIED], self.zones[DECK]
+        self.sizes[DECK], self.sizes[BURIED] = self.sizes[BURIED], self.sizes[DECK]
+
+    def moves(self, seat):
+        # Same rules as the bots: a draw only when nothing can be played
+        top_value = self.top % N_VALUES
+        hand = self.zones[seat]
+        plays = []
+        for face in hand:
+            color, value = divmod(face, N_VALUES)
+            if color == BLACK:
+                if self.sizes[seat] == 1:
+                    plays.append((0, face, 0))
+                    continue
+                # Colours we hold the most of are tried first
+                held = [0] * BLACK
+                for f, n in hand.items():
+                    if f // N_VALUES != BLACK: held[f // N_VALUES] += n
+                for pick in sorted(range(BLACK), key=lambda c: -held[c]):
+                    plays.append((1 if value == WILD4 else 3, face, pick))
+            elif color == self.color or value == top_value:
+                plays.append((0 if value in (SKIP, DRAW2) else 2, face, color))
+        if not plays: return [None]
+        plays.sort(key=lambda m: m[0])
+        return [(face, color) for _, face, color in plays]
+
+    def estimate(self):
+        # Horizon guess: the shorter hand is likelier to go out first
+        mine, theirs = self.sizes[ME], self.sizes[OPP]
+        return theirs / (mine + theirs)
+
+    # SEARCH
+    def decide(self, seat, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes > self.max_nodes: raise SearchBudget()
+        key = self.key ^ self.z_turn[seat]
+        self.probes += 1
+        entry = self.table.get(key)
+        hint = None
+        if entry is not None:
+            stored_depth, value, flag, hint = entry
+            if stored_depth >= depth and (flag == EXACT or (flag == LOWER and value >= beta) or
+                                          (flag == UPPER and value <= alpha)):
+                self.hits += 1
+                if stored_depth != SOLVED: self.cut += 1
+                return value
+        if depth == 0:
+            self.cut += 1
+            return self.estimate()
+
+        moves = self.moves(seat)
+        if hint in moves and moves[0] != hint:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        cut_before = self.cut
+        low, high = alpha, beta
+        maximizing = seat == ME
+        best, best_move = (-1.0 if maximizing else 2.0), moves[0]
+        for move in moves:
+            value = self.play(seat, move, depth - 1, alpha, beta)
+            if maximizing:
+                if value > best: best, best_move = value, move
+                if value > alpha: alpha = value
+            else:
+                if value < best: best, best_move = value, move
+                if value < beta: beta = value
+            if alpha >= beta: break
+        flag = UPPER if best <= low else LOWER if best >= high else EXACT
+        self.table[key] = (SOLVED if self.cut == cut_before else depth, best, flag, best_move)
+        return best
+
+    def play(self, seat, move, depth, alpha, beta):
+        other = 1 - seat
+        if move is None:
+            return self.chance(seat, 1, other, depth, alpha, beta)
+        face, color = move
+        old_top, old_color = self.top, self.color
+        self.remove(seat, face)
+        self.add(BURIED, old_top)
+        self.set_top(face, color)
+        if self.sizes[seat] == 0:
+            value = 1.0 if seat == ME else 0.0
+        else:
+            # Two seats: Reverse just passes the turn, Skip and penalties come back round
+            card_value = face % N_VALUES
+            if card_value == SKIP:
+                value = self.decide(seat, depth, alpha, beta)
+            elif card_value == DRAW2:
+                value = self.chance(other, 2, seat, depth, alpha, beta)
+            elif card_value == WILD4:
+                value = self.chance(other, 4, seat, depth, alpha, beta)
+            else:
+                value = self.decide(other, depth, alpha, beta)
+        self.set_top(old_top, old_color)
+        self.remove(BURIED, old_top)
+        self.add(seat, face)
+        return value
+
+    def chance(self, seat, count, next_seat, depth, alpha, beta):
+        # seat draws count cards, then next_seat moves
+        if count == 0:
+            return self.decide(next_seat, depth, alpha, beta)
+        if depth == 0:
+            # Every outcome lands on the horizon, where only hand sizes count
+            self.cut += 1
+            drawn = min(count, self.sizes[DECK] + self.sizes[BURIED])
+            self.sizes[seat] += drawn
+            value = self.estimate()
+            self.sizes[seat] -= drawn
+            return value
+        if self.sizes[DECK] == 0:
+            if self.sizes[BURIED] == 0:
+                return self.decide(next_seat, depth, alpha, beta)
+            self.swap_piles()
+            value = self.chance(seat, count, next_seat, depth, alpha, beta)
+            self.swap_piles()
+            return value
+        if self.sizes[DECK] <= count:
+            # The rest of the deck is drawn whatever its order, then the refill
+            taken = [face for face, n in self.zones[DECK].items() for _ in range(n)]
+            self.move_cards(taken, DECK, seat)
+            value = self.chance(seat, count - len(taken), next_seat, depth, alpha, beta)
+            self.move_cards(taken, seat, DECK)
+            return value
+
+        # Star1 pruning: unseen outcomes are somewhere in [0, 1]
+        value, remaining = 0.0, 1.0
+        for p, drawn in self.draws(count):
+            self.nodes += 1
+            remaining -= p
+            lo = max(0.0, (alpha - value - remaining) / p)
+            hi = min(1.0, (beta - value) / p)
+            self.move_cards(drawn, DECK, seat)
+            child = self.decide(next_seat, depth, lo, hi)
+            self.move_cards(drawn, seat, DECK)
+            value += p * child
+            if value + remaining <= alpha: return value + remaining
+            if value >= beta: return value
+        return value
+
+    def draws(self, count):
+        # Order doesn't matter, so each multiset of faces is one outcome with
+        # its hypergeometric probability instead of count! orderings
+        faces = list(self.zones[DECK].items())
+        left = [0] * (len(faces) + 1)
+        for i in range(len(faces) - 1, -1, -1):
+            left[i] = left[i + 1] + faces[i][1]
+        outcomes = comb(self.sizes[DECK], count)
+
+        def pick(i, k, drawn, ways):
+            if k == 0:
+                yield ways / outcomes, drawn
+                return
+            if left[i] < k: return
+            face, n = faces[i]
+            for take in range(min(n, k), -1, -1):
+                yield from pick(i + 1, k - take, drawn + (face,) * take, ways * comb(n, take))
+        return pick(0, count, (), 1)
+
+    def move_cards(self, faces, src, dst):
+        for face in faces:
+            self.remove(src, face)
+            self.add(dst, face)
+
+    # ENTRY POINT
+    def solve(self, engine, player):
+        if len(self.table) > self.max_entries: self.table.clear()
+        self.load(engine, player)
+        moves = self.moves(ME)
+        if len(moves) == 1:
+            self.last_stats = {'value': None, 'depth': 0, 'exact': False, 'budget': False, 'nodes': 0, 'elapsed': 0.0,
+                               'nodes_per_sec': 0.0, 'hit_rate': 0.0, 'table_size': len(self.table)}
+            return moves[0]
+        root = self.key
+        self.nodes = self.probes = self.hits = 0
+        value, move, depth, exact, budget = self.estimate(), moves[0], 0, False, False
+        start = time.perf_counter()
+        # Iterative deepening until the tree is searched to the end or the node budget runs out;
+        # short of the end, move and value come from the deepest finished pass and are approximate
+        for limit in range(1, self.max_depth + 1):
+            self.cut = 0
+            try:
+                value = self.decide(ME, limit, 0.0, 1.0)
+            except SearchBudget:
+                budget = True
+                break
+            move, depth = self.table[root][3], limit
+            if self.cut == 0:
+                exact = True
+                break
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            'value': value, 'depth': depth, 'exact': exact, 'budget': budget, 'nodes': self.nodes, 'elapsed': elapsed,
+            'nodes_per_sec': self.nodes / elapsed if elapsed else 0.0,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0, 'table_size': len(self.table),
+        }
+        totals = self.totals
+        totals['searches'] += 1
+        totals['exact'] += exact
+        totals['budget'] += budget
+        if not exact: totals['depth'] += depth
+        totals['nodes'] += self.nodes
+        totals['probes'] += self.probes
+        totals['hits'] += self.hits
+        totals['seconds'] += elapsed
+        return move
+
+    def choose_move(self, engine, player):
+        move = self.solve(engine, player)
+        if move is None: return {'type': 'draw'}
+        face, color = move
+        idx = next(i for i, card in enumerate(player.hand) if face_of(card) == face)
+        card = player.hand[idx]
+        chosen = COLOR_NAMES[color] if card.color_id == BLACK else None
+        return {'type': 'play', 'idx': idx, 'color': chosen, 'card_obj': card}
+
+def format_solver_stats(totals):
+    seconds = max(totals['seconds'], 1e-9)
+    searches = max(totals['searches'], 1)
+    estimated = max(totals['searches'] - totals['exact'], 1)
+    return (f"{totals['searches']:,} searches, {totals['exact'] / searches * 100:.1f}% solved exactly, "
+            f"the rest approximate (avg depth {totals['depth'] / estimated:.1f}, "
+            f"{totals['budget'] / searches * 100:.1f}% cut by the node budget), "
+            f"{totals['nodes'] / seconds:,.0f} nodes/sec, "
+            f"{totals['hits'] / max(totals['probes'], 1) * 100:.1f}% table hits")
@@ -0,0 +1,436 @@
+import random
+import struct
+from bisect import bisect_right
+
+from .cards import (BLACK, BLUE, CARDS, COLOR_IDS, COLOR_NAMES, DECK_SIZE, DRAW2, GREEN, HAND_SIZE, MAX_DECKS,
+                    MAX_PLAYERS, MIN_PLAYERS, RED, REVERSE, SKIP, SORT_KEY_FUNCS, SORT_KEYS, VALUE_NAMES, WILD4,
+                    YELLOW, shoe)
+from .endgame import ENDGAME_CARDS, EndgameSolver
+from .sorting import merge_sort_hand
+from .structures import ActionQueue, CardStack, CircularDoublyLinkedList, EventJournal
+
+# GAME LOGIC
+# Event kinds recorded by UnoEngine; seat and arg meaning depend on the kind
+EV_START, EV_PLAY, EV_DRAW, EV_COLOR, EV_REVERSE, EV_SKIP, EV_PENALTY, EV_RESHUFFLE, EV_EMPTY, EV_LEAVE, EV_DEAL = range(11)
+
+class Hand:
+    # List of cards that keeps per-colour and per-value counts up to date,
+    # so "anything playable?" and "best colour" never scan the hand
+    def __init__(self, cards=()):
+        self.items = []
+        self.color_counts = [0] * len(COLOR_NAMES)
+        self.value_counts = [0] * len(VALUE_NAMES)
+        # When set, add() keeps the hand ordered by this SORT_KEYS entry
+        self.sort_key = None
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        self.items.append(card)
+        self.color_counts[card.color_id] += 1
+        self.value_counts[card.value_id] += 1
+
+    def add(self, card):
+        # Drawn cards go through here: appended, or bisected into place in keep-sorted mode
+        if self.sort_key is None:
+            self.append(card)
+        else:
+            self.insert(bisect_right(self.items, SORT_KEYS[self.sort_key][card.id],
+                                     key=SORT_KEY_FUNCS[self.sort_key]), card)
+
+    def sort(self, sort_key):
+        # One-shot: the cards are ordered now, later draws go on the end again
+        self.items = merge_sort_hand(self.items, sort_key)
+        self.sort_key = None
+
+    def keep_sorted(self, sort_key):
+        # Sorts once; later draws keep the order, so re-sorting by the same key is free.
+        # None turns the mode off and leaves the cards where they are.
+        if sort_key == self.sort_key: return
+        if sort_key is not None: self.items = merge_sort_hand(self.items, sort_key)
+        self.sort_key = sort_key
+
+    def insert(self, index, card):
+        self.items.insert(index, card)
+        self.color_counts[card.color_id] += 1
+        self.value_counts[card.value_id] += 1
+
+    def pop(self, index=-1):
+        card = self.items.pop(index)
+        self.color_counts[card.color_id] -= 1
+        self.value_counts[card.value_id] -= 1
+        return card
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def has_playable(self, color_id, value_id):
+        return (self.color_counts[color_id] > 0 or
+                self.value_counts[value_id] > 0 or
+                self.color_counts[BLACK] > 0)
+
+    def first_playable(self, color_id, value_id):
+        if not self.has_playable(color_id, value_id): return None
+        for i, card in enumerate(self.items):
+            if card.color_id == color_id or card.value_id == value_id or card.color_id == BLACK:
+                return i
+        return None
+
+    def playable_indices(self, color_id, value_id):
+        if not self.has_playable(color_id, value_id): return []
+        return [i for i, card in enumerate(self.items)
+                if card.color_id == color_id or card.value_id == value_id or card.color_id == BLACK]
+
+    def best_color(self):
+        # Most common non-wild colour, ties go Red, Blue, Green, Yellow
+        counts = self.color_counts[:BLACK]
+        return counts.index(max(counts))
+
+class Player:
+    def __init__(self, name, is_ai=False, strategy=None):
+        self.name = name
+        self.seat = None
+        self.hand = Hand()
+        self.is_ai = is_ai
+        # Optional object with choose_move(engine, player) returning a move dict
+        self.strategy = strategy
+
+    @property
+    def hand(self):
+        return self._hand
+
+    @hand.setter
+    def hand(self, cards):
+        # A plain list is taken in the order given, with keep-sorted mode off
+        self._hand = cards if isinstance(cards, Hand) else Hand(cards)
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_HEADER = struct.Struct('<BBBbBBBHH')
+RNG_STATE = struct.Struct('<625IBd')
+# Keep-sorted mode per hand: 0 for off, else 1 + position in SORT_KEYS
+SORT_MODES = (None,) + tuple(SORT_KEYS)
+
+class UnoEngine:
+    def __init__(self, record_events=True, seed=None):
+        # Every engine owns its RNG so games replay from their seed
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.deck = CardStack(self.rng)
+        self.discard = CardStack(self.rng)
+        self.players = CircularDoublyLinkedList()
+        self.seats = []
+        # Events are stored as small tuples; sidebar text is only built when asked for
+        self.record_events = record_events
+        self.journal = EventJournal()
+        self.logs = ActionQueue(formatter=self.describe)
+        # CardTrackers see every event, even when nothing is recorded
+        self.trackers = []
+        self.direction = 1 
+        self.current_color = None
+        self.game_over = False
+        self.winner = None
+        self.status_msg = "Game Started"
+        self.turn = 0
+        # Open-hand analysis: bots see every hand and solve two-seat endgames exactly
+        self.open_hand = False
+        self.endgame_cards = ENDGAME_CARDS
+        self.solver = None
+
+    def record(self, kind, seat=0, arg=0):
+        for tracker in self.trackers:
+            tracker.event(kind, seat, arg)
+        if not self.record_events: return
+        self.journal.append(kind, seat, arg)
+        self.logs.enqueue((kind, seat, arg))
+
+    def describe(self, event):
+        kind, seat, arg = event
+        if kind == EV_START:
+            return f"Start Card: {CARDS[arg].color} {CARDS[arg].value}"
+        if kind == EV_PLAY:
+            return f"{self.seats[seat].name} played {CARDS[arg].value}"
+        if kind == EV_DRAW:
+            return f"{self.seats[seat].name} drew a card"
+        if kind == EV_COLOR:
+            color, random_pick = arg & 7, arg >> 3
+            if random_pick: return f"{self.seats[seat].name} (AI) chose {COLOR_NAMES[color]}"
+            return f"{self.seats[seat].name} changed color to {COLOR_NAMES[color]}"
+        if kind == EV_REVERSE:
+            return "Direction Reversed!"
+        if kind == EV_SKIP:
+            return "Next player skipped!"
+        if kind == EV_PENALTY:
+            return f"{self.seats[seat].name} drew {arg} and skipped!"
+        if kind == EV_RESHUFFLE:
+            return "Deck Reshuffled"
+        if kind == EV_EMPTY:
+            return "Deck Empty!"
+        if kind == EV_LEAVE:
+            return f"{self.seats[seat].name} left the table"
+        if kind == EV_DEAL:
+            return f"Dealt {arg} deck{'s' if arg > 1 else ''} to {seat} players"
+        return f"Unknown event {kind}"
+
+    def add_player(self, player):
+        player.seat = len(self.seats)
+        self.seats.append(player)
+        self.players.add_player(player)
+
+    def seat_players(self, count=3):
+        self.add_player(Player("You"))
+        for i in range(1, count):
+            self.add_player(Player(f"Bot {i}", is_ai=True))
+
+    def remove_player(self, player):
+        # A seat drops out: its cards go under the deck and play moves on
+        if self.players.current.data is player: self.next_turn()
+        self.players.remove_player(player.seat)
+        self.deck.items[:0] = player.hand.items
+        player.hand = []
+        self.record(EV_LEAVE, player.seat)
+        if self.players.size == 1 and not self.game_over:
+            self.game_over = True
+            self.winner = self.players.get_current_player()
+            self.status_msg = f"{self.winner.name} WINS!"
+
+    def initialize_game(self, players=3, decks=1):
+        if not MIN_PLAYERS <= players <= MAX_PLAYERS:
+            raise ValueError(f"Players must be {MIN_PLAYERS}-{MAX_PLAYERS}, got {players}")
+        if not 1 <= decks <= MAX_DECKS:
+            raise ValueError(f"Decks must be 1-{MAX_DECKS}, got {decks}")
+        # Hands may take at most two thirds of the shoe
+        if players * HAND_SIZE > decks * DECK_SIZE * 2 // 3:
+            raise ValueError(f"{decks} deck{'s' if decks > 1 else ''} is too small for {players} players")
+        self.record(EV_DEAL, players, decks)
+        self.deck.items = shoe(decks)
+        self.deck.shuffle()
+
+        self.seat_players(players)
+
+        for player in self.seats:
+            for _ in range(HAND_SIZE):
+                player.hand.append(self.deck.pop())
+
+        first_card = self.deck.pop()
+        while first_card.color_id == BLACK: 
+            self.deck.push(first_card)
+            self.deck.shuffle()
+            first_card = self.deck.pop()
+        self.discard.push(first_card)
+        self.current_color = first_card.color_id
+        self.record(EV_START, 0, first_card.id)
+
+    def get_current_player(self):
+        return self.players.get_current_player()
+
+    def check_playable(self, card):
+        top = self.discard.peek()
+        return (card.color_id == self.current_color or 
+                card.value_id == top.value_id or 
+                card.color_id == BLACK)
+
+    def playable_indices(self, player):
+        top = self.discard.peek()
+        return player.hand.playable_indices(self.current_color, top.value_id)
+
+    def next_turn(self):
+        if self.direction == 1:
+            self.players.move_next()
+        else:
+            self.players.move_prev()
+
+    def handle_special_card(self, card):
+        if card.value_id == REVERSE:
+            self.direction *= -1
+            self.record(EV_REVERSE)
+        elif card.value_id == SKIP:
+            self.record(EV_SKIP)
+            self.next_turn()
+        elif card.value_id == DRAW2:
+            self.penalize(2)
+        elif card.value_id == WILD4:
+            self.penalize(4)
+
+    def penalize(self, count):
+        temp_node = self.players.current.next if self.direction == 1 else self.players.current.prev
+        victim = temp_node.data
+        drawn = 0
+        for _ in range(count):
+            card = self.take_card()
+            if card is None: break
+            victim.hand.add(card)
+            drawn += 1
+        self.record(EV_PENALTY, victim.seat, drawn)
+        self.next_turn()
+
+    def take_card(self):
+        # Every draw comes through here; an empty deck takes over the discard pile first
+        if self.deck.is_empty():
+            if self.discard.size() <= 1: return None
+            self.deck.refill_from(self.discard)
+            self.record(EV_RESHUFFLE)
+        return self.deck.pop()
+
+    def play_card(self, player, card_index, chosen_color=None):
+        self.turn += 1
+        card = player.hand.pop(card_index)
+        
+        # The declared colour lives on the engine, the card itself stays Black
+        if card.color_id == BLACK:
+            if chosen_color:
+                self.current_color = COLOR_IDS[chosen_color]
+                self.record(EV_COLOR, player.seat, self.current_color)
+            else:
+                self.current_color = self.rng.choice([RED, BLUE, GREEN, YELLOW])
+                self.record(EV_COLOR, player.seat, self.current_color | 8)
+        else:
+            self.current_color = card.color_id
+
+        self.discard.push(card)
+        self.record(EV_PLAY, player.seat, card.id)
+        
+        self.handle_special_card(card)
+        
+        if len(player.hand) == 0:
+            self.game_over = True
+            self.winner = player
+            self.status_msg = f"{player.name} WINS!"
+            return True 
+        
+        self.next_turn()
+        return False
+
+    def draw_card(self, player):
+        self.turn += 1
+        card = self.take_card()
+        if card is None:
+            # Deck and discard pile are both exhausted
+            self.record(EV_EMPTY, player.seat)
+            self.next_turn()
+            return False # Return False to signal failure
+
+        player.hand.add(card)
+        self.record(EV_DRAW, player.seat, card.id)
+        self.next_turn()
+        return True # Return True for success
+
+    def cards_in_hands(self):
+        # Seats that left have already handed their cards back
+        return sum(len(p.hand) for p in self.seats)
+
+    def get_ai_move(self):
+        p = self.get_current_player()
+        if not p.is_ai: return None
+        if p.strategy: return p.strategy.choose_move(self, p)
+        if self.open_hand and self.players.size == 2 and self.cards_in_hands() < self.endgame_cards:
+            if self.solver is None: self.solver = EndgameSolver()
+            return self.solver.choose_move(self, p)
+        return self.heuristic_move(p)
+
+    def heuristic_move(self, p):
+        # The built-in one-pass bot: first playable card, wilds name the colour held most
+        top = self.discard.peek()
+        chosen_idx = p.hand.first_playable(self.current_color, top.value_id)
+        
+        if chosen_idx is not None:
+            card = p.hand[chosen_idx]
+            chosen_color = None
+            if card.color_id == BLACK:
+                chosen_color = COLOR_NAMES[p.hand.best_color()]
+            
+            return {'type': 'play', 'idx': chosen_idx, 'color': chosen_color, 'card_obj': card}
+        else:
+            return {'type': 'draw'}
+
+    def snapshot(self):
+        # Compact binary copy of the whole table, RNG included
+        hands = [p.hand for p in self.seats]
+        ids = [c.id for c in self.deck.items] + [c.id for c in self.discard.items]
+        for hand in hands:
+            ids.extend(c.id for c in hand)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_VERSION, len(hands), self.get_current_player().seat,
+                                      self.direction, self.current_color, self.game_over,
+                                      self.winner.seat if self.winner else 255,
+                                      self.deck.size(), self.discard.size())
+        _, mt, gauss = self.rng.getstate()
+        seated = sum(1 << p.seat for p in self.seats if p.seat in self.players)
+        counts = struct.pack(f'<IIB{len(hands)}H{len(hands)}B', self.turn, seated, self.deck.lazy,
+                             *[len(h) for h in hands], *[SORT_MODES.index(h.sort_key) for h in hands])
+        return (header + counts + struct.pack(f'<{len(ids)}H', *ids) +
+                RNG_STATE.pack(*mt, gauss is not None, gauss or 0.0))
+
+    def restore(self, data):
+        (version, n_seats, seat, direction, color, over, winner,
+         n_deck, n_discard) = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        if not self.seats: self.seat_players(n_seats)
+        if n_seats != len(self.seats):
+            raise ValueError(f"Snapshot has {n_seats} seats, engine has {len(self.seats)}")
+        offset = SNAPSHOT_HEADER.size
+        turn, seated, lazy, *hands = struct.unpack_from(f'<IIB{n_seats}H{n_seats}B', data, offset)
+        hand_sizes, sort_modes = hands[:n_seats], hands[n_seats:]
+        offset += 9 + 3 * n_seats
+        total = n_deck + n_discard + sum(hand_sizes)
+        cards = [CARDS[i] for i in struct.unpack_from(f'<{total}H', data, offset)]
+        offset += 2 * total
+
+        self.deck.items = cards[:n_deck]
+        self.deck.lazy = bool(lazy)
+        self.discard.items = cards[n_deck:n_deck + n_discard]
+        pos = n_deck + n_discard
+        for player, size, mode in zip(self.seats, hand_sizes, sort_modes):
+            # Stored order verbatim; the mode only shapes later draws
+            player.hand = cards[pos:pos + size]
+            player.hand.sort_key = SORT_MODES[mode]
+            pos += size
+        for player in self.seats:
+            if not seated >> player.seat & 1 and player.seat in self.players:
+                self.players.remove_player(player.seat)
+        self.players.current = self.players.node_for(seat)
+        self.direction = direction
+        self.current_color = color
+        self.game_over = bool(over)
+        self.winner = self.seats[winner] if winner != 255 else None
+        self.turn = turn
+        *mt, has_gauss, gauss = RNG_STATE.unpack_from(data, offset)
+        self.rng.setstate((3, tuple(mt), gauss if has_gauss else None))
+        for tracker in self.trackers:
+            tracker.sync()
+
+# REPLAY
+def apply_event(engine, kind, seat, arg, chosen=None):
+    # Re-applies one journal record; returns the colour the next wild play declares
+    if kind == EV_DEAL: return chosen
+    player = engine.seats[seat]
+    if kind == EV_COLOR:
+        # Random picks are re-rolled from the same RNG state
+        return None if arg >> 3 else COLOR_NAMES[arg & 7]
+    if kind == EV_PLAY:
+        idx = next(i for i, c in enumerate(player.hand) if c.id == arg)
+        engine.play_card(player, idx, chosen)
+        return None
+    if kind in (EV_DRAW, EV_EMPTY):
+        engine.draw_card(player)
+    elif kind == EV_LEAVE:
+        engine.remove_player(player)
+    return chosen
+
+def replay_game(seed, journal, turn=None, record_events=True):
+    # Re-deal from the seed, then re-apply the journal's decisions up to turn
+    engine = UnoEngine(record_events, seed)
+    # Journals start with the table size; older ones were always 3 seats, 1 deck
+    players, decks = 3, 1
+    if len(journal) and journal[0][0] == EV_DEAL: players, decks = journal[0][1], journal[0][2]
+    engine.initialize_game(players, decks)
+    chosen = None
+    for kind, seat, arg in journal:
+        if turn is not None and engine.turn >= turn: break
+        chosen = apply_event(engine, kind, seat, arg, chosen)
+    return engine
@@ -0,0 +1,149 @@
+import argparse
+import multiprocessing as mp
+import random
+import time
+
+from .endgame import EndgameSolver, format_solver_stats
+from .engine import UnoEngine
+
+MAX_TURNS = 5000
+
+# HEADLESS GAMES
+def new_bot_game(record_events=False, seed=None, players=3, decks=1):
+    engine = UnoEngine(record_events, seed)
+    engine.initialize_game(players, decks)
+    for player in engine.seats:
+        player.is_ai = True
+    return engine
+
+def play_headless_game(engine, max_turns=MAX_TURNS):
+    turns = 0
+    while not engine.game_over and turns < max_turns:
+        player = engine.get_current_player()
+        move = engine.get_ai_move()
+        if move['type'] == 'play':
+            engine.play_card(player, move['idx'], move['color'])
+        else:
+            engine.draw_card(player)
+        turns += 1
+    return turns
+
+# RESULTS
+class SimStats:
+    def __init__(self, seats=3):
+        self.games = 0
+        self.turns = 0
+        self.wins = [0] * seats
+        self.unfinished = 0
+        # Endgame solver counters, only filled in open-hand runs
+        self.solver = {}
+
+    def add_game(self, winner_seat, turns):
+        self.games += 1
+        self.turns += turns
+        if winner_seat is None:
+            self.unfinished += 1
+        else:
+            self.wins[winner_seat] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.turns += other.turns
+        self.unfinished += other.unfinished
+        for seat, wins in enumerate(other.wins):
+            self.wins[seat] += wins
+        for name, count in other.solver.items():
+            self.solver[name] = self.solver.get(name, 0) + count
+
+    def win_rates(self):
+        finished = self.games - self.unfinished
+        if finished == 0: return [0.0] * len(self.wins)
+        return [w / finished for w in self.wins]
+
+def chunk_seed(base_seed, chunk_index):
+    return base_seed * 1_000_003 + chunk_index
+
+def run_chunk(task):
+    seed, n_games, max_turns, players, decks, open_hand = task
+    # Each game gets its own seed drawn from the chunk's
+    seeds = random.Random(seed)
+    stats = SimStats(players)
+    # One solver per chunk, so its table carries over between games
+    solver = EndgameSolver() if open_hand else None
+    for _ in range(n_games):
+        engine = new_bot_game(seed=seeds.getrandbits(64), players=players, decks=decks)
+        engine.open_hand = open_hand
+        engine.solver = solver
+        turns = play_headless_game(engine, max_turns)
+        winner = engine.winner.seat if engine.game_over else None
+        stats.add_game(winner, turns)
+    if solver: stats.solver = dict(solver.totals)
+    return stats
+
+def iter_tasks(total_games, chunk_size, base_seed, max_turns, players=3, decks=1, open_hand=False):
+    chunk_index = 0
+    remaining = total_games
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        yield (chunk_seed(base_seed, chunk_index), n, max_turns, players, decks, open_hand)
+        remaining -= n
+        chunk_index += 1
+
+def run_simulation(total_games, workers=None, chunk_size=500, base_seed=0, max_turns=MAX_TURNS, on_progress=None,
+                   players=3, decks=1, open_hand=False):
+    totals = SimStats(players)
+    tasks = iter_tasks(total_games, chunk_size, base_seed, max_turns, players, decks, open_hand)
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(run_chunk, tasks)
+        for stats in results:
+            totals.merge(stats)
+            if on_progress: on_progress(totals, time.perf_counter() - start)
+    else:
+        with mp.Pool(workers) as pool:
+            # Chunks stream back as they finish, only their counters are kept
+            for stats in pool.imap_unordered(run_chunk, tasks):
+                totals.merge(stats)
+                if on_progress: on_progress(totals, time.perf_counter() - start)
+    return totals, time.perf_counter() - start
+
+def format_report(stats, elapsed):
+    elapsed = max(elapsed, 1e-9)
+    lines = [
+        f"Games:      {stats.games:,} ({stats.unfinished:,} hit the turn limit)",
+        f"Time:       {elapsed:.2f}s",
+        f"Games/sec:  {stats.games / elapsed:,.0f}",
+        f"Turns/sec:  {stats.turns / elapsed:,.0f}",
+        f"Avg turns:  {stats.turns / max(stats.games, 1):.1f}",
+    ]
+    for seat, rate in enumerate(stats.win_rates()):
+        lines.append(f"Seat {seat} win: {rate * 100:.2f}%")
+    if stats.solver:
+        lines.append(f"Endgame:    {format_solver_stats(stats.solver)}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless bot-only UNO games")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=500, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--players", type=int, default=3, help="seats per table (2-20)")
+    parser.add_argument("--decks", type=int, default=1, help="decks in the shoe")
+    parser.add_argument("--open-hand", action="store_true",
+                        help="bots see every hand and search two-seat endgames")
+    parser.add_argument("--progress", action="store_true")
+    args = parser.parse_args()
+
+    def progress(stats, elapsed):
+        print(f"\r{stats.games:,} games, {stats.games / max(elapsed, 1e-9):,.0f} games/sec", end="", flush=True)
+
+    stats, elapsed = run_simulation(args.games, args.workers, args.chunk, args.seed, args.max_turns,
+                                    on_progress=progress if args.progress else None,
+                                    players=args.players, decks=args.decks, open_hand=args.open_hand)
+    if args.progress: print()
+    print(format_report(stats, elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import math
+import time
+from collections import deque
+
+# PROFILING
+class LatencyHistogram:
+    # Log-spaced buckets, 8 per doubling (~9% wide), so p50/p99 come from a
+    # few dozen counters instead of every sample
+    STEPS = 8
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        us = ms * 1000
+        bucket = int(math.log2(us) * self.STEPS) if us > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max: self.max = ms
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-th sample, in ms
+        if not self.count: return 0.0
+        target = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(2 ** ((bucket + 1) / self.STEPS) / 1000, self.max)
+        return self.max
+
+class Profiler:
+    # Opt-in timing hooks. instrument() shadows methods with timed wrappers
+    # and uninstall() puts the originals back, so code that is never
+    # instrumented runs exactly as before.
+    def __init__(self, trace_limit=100_000):
+        self.histograms = {}
+        self.trace = deque(maxlen=trace_limit)
+        self.frames = deque(maxlen=trace_limit)
+        self.widgets = {'frames': 0, 'created': 0, 'destroyed': 0, 'max_created': 0, 'max_destroyed': 0}
+        self.seen_widgets = None
+        self.installed = []
+        self.origin = time.perf_counter()
+
+    def timed(self, name, fn):
+        hist = self.histograms.setdefault(name, LatencyHistogram())
+        trace = self.trace
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                hist.add(elapsed * 1000)
+                trace.append((name, start, elapsed))
+        wrapper.profiled = fn
+        return wrapper
+
+    def instrument(self, target, names, label=None):
+        # target is an instance (only it is timed) or a class (every instance is)
+        is_class = isinstance(target, type)
+        label = label or (target.__name__ if is_class else type(target).__name__)
+        for name in names:
+            current = getattr(target, name)
+            if hasattr(current, 'profiled'): continue
+            own = vars(target).get(name) if is_class else None
+            self.installed.append((target, name, own))
+            setattr(target, name, self.timed(f"{label}.{name}", current))
+
+    def uninstall(self):
+        for target, name, original in reversed(self.installed):
+            if original is None: delattr(target, name)
+            else: setattr(target, name, original)
+        self.installed = []
+
+    def frame(self, ui_stats):
+        # Widgets created/destroyed since the previous frame, from UnoGUI.ui_stats
+        created, destroyed = ui_stats['created'], ui_stats['destroyed']
+        if self.seen_widgets is None: self.seen_widgets = (0, 0)
+        new = created - self.seen_widgets[0]
+        gone = destroyed - self.seen_widgets[1]
+        self.seen_widgets = (created, destroyed)
+        w = self.widgets
+        w['frames'] += 1
+        w['created'] += new
+        w['destroyed'] += gone
+        w['max_created'] = max(w['max_created'], new)
+        w['max_destroyed'] = max(w['max_destroyed'], gone)
+        self.frames.append((time.perf_counter(), new, gone))
+
+    def summary(self):
+        rows = []
+        for name, hist in sorted(self.histograms.items(), key=lambda kv: -kv[1].total):
+            if not hist.count: continue
+            rows.append({'name': name, 'calls': hist.count, 'total_ms': hist.total,
+                         'p50_ms': hist.percentile(0.5), 'p99_ms': hist.percentile(0.99), 'max_ms': hist.max})
+        return rows
+
+    def report(self):
+        lines = [f"{'hook':32} {'calls':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for row in self.summary():
+            lines.append(f"{row['name']:32} {row['calls']:7} {row['p50_ms']:8.2f} "
+                         f"{row['p99_ms']:8.2f} {row['max_ms']:8.2f}")
+        w = self.widgets
+        if w['frames']:
+            lines.append(f"widgets/frame: +{w['created'] / w['frames']:.1f} -{w['destroyed'] / w['frames']:.1f} "
+                         f"(max +{w['max_created']} -{w['max_destroyed']})")
+        return "\n".join(lines)
+
+    def export_trace(self, path):
+        # Chrome trace event format: open in chrome://tracing or Perfetto
+        import json  # only needed here; keeps json off every worker's import path
+        events = [{'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': (start - self.origin) * 1e6, 'dur': elapsed * 1e6}
+                  for name, start, elapsed in self.trace]
+        events.extend({'name': 'widgets', 'ph': 'C', 'pid': 0, 'tid': 0,
+                       'ts': (at - self.origin) * 1e6, 'args': {'created': new, 'destroyed': gone}}
+                      for at, new, gone in self.frames)
+        with open(path, "w") as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+ENGINE_HOOKS = ('initialize_game', 'get_ai_move', 'play_card', 'draw_card')
@@ -0,0 +1,68 @@
+from .cards import SORT_KEYS
+
+# SORTING
+# Bottom-up merge sort over precomputed integer keys (SORT_KEYS, built from
+# the card table). Each card is decorated as key * n + position, so keys are
+# unique, ties keep hand order and every comparison is between two ints.
+def merge_sort_hand(hand, sort_key='color'):
+    n = len(hand)
+    if n <= 1:
+        return list(hand)
+    keys = SORT_KEYS[sort_key]
+    src = [keys[card.id] * n + i for i, card in enumerate(hand)]
+    dst = [0] * n
+
+    width = 1
+    while width < n:
+        lo = 0
+        while lo < n:
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            merge_runs(src, dst, lo, mid, hi)
+            lo = hi
+        src, dst = dst, src
+        width *= 2
+
+    return [hand[k % n] for k in src]
+
+def merge_runs(src, dst, lo, mid, hi):
+    # Merges src[lo:mid] and src[mid:hi] into dst[lo:hi] in place
+    i, j, k = lo, mid, lo
+    while i < mid and j < hi:
+        if src[j] < src[i]:
+            dst[k] = src[j]
+            j += 1
+        else:
+            dst[k] = src[i]
+            i += 1
+        k += 1
+    while i < mid:
+        dst[k] = src[i]
+        i += 1
+        k += 1
+    while j < hi:
+        dst[k] = src[j]
+        j += 1
+        k += 1
+
+def merge(left, right, sort_key):
+    # Merges two already sorted hands; on equal keys the left card goes first
+    keys = SORT_KEYS[sort_key]
+    sorted_list = []
+    i = j = 0
+    n_left, n_right = len(left), len(right)
+    while i < n_left and j < n_right:
+        if keys[right[j].id] < keys[left[i].id]:
+            sorted_list.append(right[j])
+            j += 1
+        else:
+            sorted_list.append(left[i])
+            i += 1
+
+    while i < n_left:
+        sorted_list.append(left[i])
+        i += 1
+    while j < n_right:
+        sorted_list.append(right[j])
+        j += 1
+    return sorted_list
@@ -0,0 +1,166 @@
+import random
+import struct
+
+# DATA STRUCTURES
+class Node:
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+        self.prev = None
+
+class ActionQueue:
+    # Fixed-size ring buffer, oldest entry is overwritten when full
+    def __init__(self, capacity=8, formatter=None):
+        self.items = [None] * capacity
+        self.capacity = capacity
+        self.start = 0
+        self.count = 0
+        self.formatter = formatter
+
+    def enqueue(self, item):
+        end = (self.start + self.count) % self.capacity
+        self.items[end] = item
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def get_all(self):
+        ordered = [self.items[(self.start + i) % self.capacity] for i in range(self.count)]
+        if self.formatter: return [self.formatter(item) for item in ordered]
+        return ordered
+
+class EventJournal:
+    # Append-only log of fixed-width (kind, seat, arg) records
+    RECORD = struct.Struct('<BBH')
+
+    def __init__(self, data=b""):
+        self.buffer = bytearray(data)
+
+    def append(self, kind, seat, arg):
+        self.buffer += self.RECORD.pack(kind, seat, arg)
+
+    def __len__(self):
+        return len(self.buffer) // self.RECORD.size
+
+    def __iter__(self):
+        return self.RECORD.iter_unpack(self.buffer)
+
+    def __getitem__(self, index):
+        if index < 0: index += len(self)
+        return self.RECORD.unpack_from(self.buffer, index * self.RECORD.size)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.buffer)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+class CardStack:
+    def __init__(self, rng=None):
+        self.items = []
+        self.rng = rng or random
+        # A lazy stack is unordered: each pop takes a random card, which is
+        # one Fisher-Yates step, so a refill costs nothing up front
+        self.lazy = False
+
+    def push(self, item):
+        self.items.append(item)
+
+    def pop(self):
+        items = self.items
+        if not items: return None
+        if self.lazy:
+            j = self.rng.randrange(len(items))
+            items[j], items[-1] = items[-1], items[j]
+        return items.pop()
+
+    def refill_from(self, pile):
+        # Takes every card under pile's top by swapping buffers; only valid when empty
+        top = pile.items.pop()
+        self.items, pile.items = pile.items, self.items
+        pile.items.append(top)
+        self.lazy = True
+
+    def peek(self):
+        if not self.is_empty():
+            return self.items[-1]
+        return None
+
+    def is_empty(self):
+        return len(self.items) == 0
+
+    def size(self):
+        return len(self.items)
+
+    def shuffle(self):
+        self.rng.shuffle(self.items)
+        self.lazy = False
+
+class CircularDoublyLinkedList:
+    # Seat ring with an index by seat id and by name, so lookups and
+    # removals never walk the list
+    def __init__(self):
+        self.head = None
+        self.current = None
+        self.size = 0
+        self.by_seat = {}
+        self.by_name = {}
+
+    def add_player(self, player):
+        if player.name in self.by_name:
+            raise ValueError(f"Duplicate player name {player.name!r}")
+        new_node = Node(player)
+        self.by_seat[player.seat] = new_node
+        self.by_name[player.name] = new_node
+        if not self.head:
+            self.head = new_node
+            self.head.next = self.head
+            self.head.prev = self.head
+            self.current = self.head
+        else:
+            tail = self.head.prev
+            tail.next = new_node
+            new_node.prev = tail
+            new_node.next = self.head
+            self.head.prev = new_node
+        self.size += 1
+
+    def remove_player(self, seat):
+        node = self.by_seat.pop(seat)
+        del self.by_name[node.data.name]
+        self.size -= 1
+        if self.size == 0:
+            self.head = self.current = None
+            return node.data
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        if self.head is node: self.head = node.next
+        if self.current is node: self.current = node.next
+        return node.data
+
+    def node_for(self, seat):
+        return self.by_seat[seat]
+
+    def get(self, seat):
+        node = self.by_seat.get(seat)
+        return node.data if node else None
+
+    def find(self, name):
+        node = self.by_name.get(name)
+        return node.data if node else None
+
+    def __contains__(self, seat):
+        return seat in self.by_seat
+
+    def get_current_player(self):
+        return self.current.data
+
+    def move_next(self):
+        self.current = self.current.next
+
+    def move_prev(self):
+        self.current = self.current.prev
@@ -0,0 +1,172 @@
+from math import exp, lgamma
+
+from .cards import BLACK, CARDS, COLOR_NAMES, VALUE_NAMES, shoe
+from .engine import EV_COLOR, EV_DEAL, EV_DRAW, EV_EMPTY, EV_PENALTY, EV_PLAY, EV_RESHUFFLE, EV_START
+
+# CARD COUNTING
+# What one seat can know: every played card is public, its own hand is
+# private, and the rest (deck plus other hands) is unseen. Other seats'
+# draws only ever count as "one unknown card".
+NO_INFO = 1 << 30
+
+def log_comb(n, k):
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+def p_none(slots, bad, pool):
+    # Chance that slots cards dealt from pool include none of its bad cards
+    if slots <= 0 or bad <= 0: return 1.0
+    if pool - bad < slots: return 0.0
+    return exp(log_comb(pool - bad, slots) - log_comb(pool, slots))
+
+class CardTracker:
+    def __init__(self, engine, viewer):
+        # Starts from the table as it is and follows the engine's events from here
+        self.engine = engine
+        self.viewer = viewer
+        self.seat = viewer.seat
+        self.sync()
+        engine.trackers.append(self)
+
+    def __getstate__(self):
+        # Pickled without its table; copy_to binds it to the receiver's copy
+        state = dict(self.__dict__)
+        state['engine'] = state['viewer'] = None
+        return state
+
+    def copy_to(self, engine):
+        # Same knowledge, following another engine that holds the same table
+        tracker = CardTracker.__new__(CardTracker)
+        tracker.__dict__.update(self.__dict__)
+        for name in ('hidden_colors', 'hidden_values', 'buried_colors', 'buried_values'):
+            setattr(tracker, name, list(getattr(self, name)))
+        tracker.slots = [list(slots) for slots in self.slots]
+        tracker.engine = engine
+        tracker.viewer = engine.seats[self.seat]
+        engine.trackers.append(tracker)
+        return tracker
+
+    def detach(self):
+        self.engine.trackers.remove(self)
+
+    def sync(self):
+        # Rebuilt from the table as it stands; after this only events are used
+        engine = self.engine
+        self.hidden_colors = [0] * len(COLOR_NAMES)
+        self.hidden_values = [0] * len(VALUE_NAMES)
+        self.hidden = 0
+        cards = list(engine.deck.items)
+        for player in engine.seats:
+            cards.extend(player.hand)
+        for card in cards:
+            self.hide(card, 1)
+        self.buried_colors = [0] * len(COLOR_NAMES)
+        self.buried_values = [0] * len(VALUE_NAMES)
+        self.buried = 0
+        for card in engine.discard.items[:-1]:
+            self.bury(card)
+        self.top = engine.discard.peek()
+        self.color = engine.current_color
+        # slots[seat][colour]: how many cards in that hand could still be this
+        # colour. A draw on a seat's turn means it had nothing to follow with.
+        self.slots = [[NO_INFO] * len(COLOR_NAMES) for _ in engine.seats]
+
+    def hide(self, card, count):
+        self.hidden_colors[card.color_id] += count
+        self.hidden_values[card.value_id] += count
+        self.hidden += count
+
+    def bury(self, card):
+        self.buried_colors[card.color_id] += 1
+        self.buried_values[card.value_id] += 1
+        self.buried += 1
+
+    # EVENTS
+    def event(self, kind, seat, arg):
+        if kind == EV_PLAY:
+            card = CARDS[arg]
+            self.hide(card, -1)
+            if self.top is not None: self.bury(self.top)
+            self.top = card
+            if card.color_id != BLACK: self.color = card.color_id
+            slots = self.slots[seat]
+            size = len(self.engine.seats[seat].hand)
+            slots[card.color_id] = max(slots[card.color_id] - 1, 0)
+            for c, n in enumerate(slots):
+                if n > size: slots[c] = size
+        elif kind == EV_COLOR:
+            self.color = arg & 7
+        elif kind == EV_DRAW or kind == EV_EMPTY:
+            # Nothing in hand matched the colour, and no wild either
+            slots = self.slots[seat]
+            slots[self.color] = slots[BLACK] = 0
+            if kind == EV_DRAW: self.received(seat, 1)
+        elif kind == EV_PENALTY:
+            self.received(seat, arg)
+        elif kind == EV_RESHUFFLE:
+            # Played cards go back under the deck and are unseen again
+            for c, n in enumerate(self.buried_colors):
+                self.hidden_colors[c] += n
+            for v, n in enumerate(self.buried_values):
+                self.hidden_values[v] += n
+            self.hidden += self.buried
+            self.buried_colors = [0] * len(COLOR_NAMES)
+            self.buried_values = [0] * len(VALUE_NAMES)
+            self.buried = 0
+        elif kind == EV_START:
+            self.top = CARDS[arg]
+            self.color = self.top.color_id
+            self.hide(self.top, -1)
+        elif kind == EV_DEAL:
+            self.hidden_colors = [0] * len(COLOR_NAMES)
+            self.hidden_values = [0] * len(VALUE_NAMES)
+            self.hidden = 0
+            for card in shoe(arg):
+                self.hide(card, 1)
+            self.slots = [[NO_INFO] * len(COLOR_NAMES) for _ in range(seat)]
+
+    def received(self, seat, count):
+        slots = self.slots[seat]
+        for c in range(len(slots)):
+            if slots[c] < NO_INFO: slots[c] += count
+
+    # QUERIES
+    def unseen_color(self, color):
+        return self.hidden_colors[color] - self.viewer.hand.color_counts[color]
+
+    def unseen_value(self, value):
+        return self.hidden_values[value] - self.viewer.hand.value_counts[value]
+
+    def unseen(self):
+        return self.hidden - len(self.viewer.hand)
+
+    def is_void(self, seat, color):
+        return self.slots[seat][color] == 0
+
+    def open_slots(self, seat, color):
+        return min(self.slots[seat][color], len(self.engine.seats[seat].hand))
+
+    def p_holds(self, seat, color):
+        # At least one card of this colour, treating unknown cards as dealt
+        # at random from what this seat hasn't seen
+        size = len(self.engine.seats[seat].hand)
+        k = self.open_slots(seat, color)
+        pool = self.unseen() - (size - k)
+        return 1.0 - p_none(k, self.unseen_color(color), pool)
+
+    def p_can_follow(self, seat, color):
+        # Holds the colour or a wild. Slots ruled out for one but not the
+        # other are counted as independent, so this is an estimate.
+        size = len(self.engine.seats[seat].hand)
+        kc, kw = self.open_slots(seat, color), self.open_slots(seat, BLACK)
+        both = min(kc, kw)
+        pool = self.unseen() - (size - max(kc, kw))
+        nc, nw = self.unseen_color(color), self.unseen_color(BLACK)
+        return 1.0 - (p_none(both, nc + nw, pool) * p_none(kc - both, nc, pool) *
+                      p_none(kw - both, nw, pool))
+
+    def next_seat(self):
+        node = self.engine.players.node_for(self.viewer.seat)
+        return (node.next if self.engine.direction == 1 else node.prev).data.seat
+
+    def p_next_can_follow(self, color):
+        return self.p_can_follow(self.next_seat(), color)